@@ -2,6 +2,7 @@ import os
 import yaml
 from typing import List
 from .models import Config, FrameworkConfig, TestCaseConfig
+from .tag_query import TagIndex
 
 
 class ConfigLoader:
@@ -22,6 +23,7 @@ class ConfigLoader:
         )
 
         config.validate()
+        config.tag_index = TagIndex(config.testcases)
 
         return config
 
@@ -1,9 +1,19 @@
 """Configuration data models"""
 
 import os
+import re
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 
+from .tag_query import TagIndex
+
+
+# Build outputs and installed modules that never trigger a rerun in watch mode
+DEFAULT_WATCH_EXCLUDE = [
+    "build", ".hvigor", "oh_modules", "node_modules", ".git", ".idea", ".preview", ".cxx",
+    "*.log", "*.swp", "*~",
+]
+
 
 @dataclass
 class BuildToolsConfig:
@@ -67,6 +77,181 @@ class BuildToolsConfig:
             raise ValueError(f"Java home directory does not exist: {self.java_home}")
 
 
+@dataclass
+class OhpmCacheConfig:
+
+    enabled: bool = True
+    dir: str = os.path.join("~", ".cache", "arkts_test_framework", "ohpm")
+    max_size_mb: int = 10240
+    link: str = "auto"
+
+    LINK_MODES = ["auto", "reflink", "hardlink", "copy"]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OhpmCacheConfig":
+        defaults = cls()
+        return cls(
+            enabled=data.get("enabled", True),
+            dir=data.get("dir", defaults.dir),
+            max_size_mb=data.get("max_size_mb", 10240),
+            link=data.get("link", "auto"),
+        )
+
+    def validate(self):
+        if not self.dir or not isinstance(self.dir, str):
+            raise ValueError("ohpm_cache.dir cannot be empty")
+
+        if not isinstance(self.max_size_mb, int) or self.max_size_mb <= 0:
+            raise ValueError(
+                f"ohpm_cache.max_size_mb must be greater than 0, current value: {self.max_size_mb}"
+            )
+
+        if self.link not in self.LINK_MODES:
+            raise ValueError(
+                f"Invalid ohpm_cache.link: {self.link}, "
+                f"must be one of: {', '.join(self.LINK_MODES)}"
+            )
+
+
+@dataclass
+class OutputStoreConfig:
+
+    enabled: bool = True
+    compression: str = "zlib"
+    retention_days: int = 30
+    max_size_mb: int = 2048
+
+    COMPRESSIONS = ["zlib", "lzma"]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OutputStoreConfig":
+        return cls(
+            enabled=data.get("enabled", True),
+            compression=data.get("compression", "zlib"),
+            retention_days=data.get("retention_days", 30),
+            max_size_mb=data.get("max_size_mb", 2048),
+        )
+
+    def validate(self):
+        if self.compression not in self.COMPRESSIONS:
+            raise ValueError(
+                f"Invalid output_store.compression: {self.compression}, "
+                f"must be one of: {', '.join(self.COMPRESSIONS)}"
+            )
+
+        if not isinstance(self.retention_days, int) or self.retention_days < 0:
+            raise ValueError(
+                f"output_store.retention_days cannot be negative, current value: {self.retention_days}"
+            )
+
+        if not isinstance(self.max_size_mb, int) or self.max_size_mb < 0:
+            raise ValueError(
+                f"output_store.max_size_mb cannot be negative, current value: {self.max_size_mb}"
+            )
+
+
+@dataclass
+class AdaptiveTimeoutConfig:
+
+    enabled: bool = True
+    multiplier: float = 3.0
+    min_timeout: int = 30
+    max_timeout: int = 3600
+    min_samples: int = 5
+    history_size: int = 50
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AdaptiveTimeoutConfig":
+        return cls(
+            enabled=data.get("enabled", True),
+            multiplier=data.get("multiplier", 3.0),
+            min_timeout=data.get("min_timeout", 30),
+            max_timeout=data.get("max_timeout", 3600),
+            min_samples=data.get("min_samples", 5),
+            history_size=data.get("history_size", 50),
+        )
+
+    def validate(self):
+        if not isinstance(self.multiplier, (int, float)) or self.multiplier < 1:
+            raise ValueError(
+                f"adaptive_timeout.multiplier must be at least 1, current value: {self.multiplier}"
+            )
+
+        if not isinstance(self.min_timeout, int) or self.min_timeout <= 0:
+            raise ValueError(
+                f"adaptive_timeout.min_timeout must be greater than 0, current value: {self.min_timeout}"
+            )
+
+        if not isinstance(self.max_timeout, int) or self.max_timeout < self.min_timeout:
+            raise ValueError(
+                f"adaptive_timeout.max_timeout must be at least min_timeout ({self.min_timeout}), "
+                f"current value: {self.max_timeout}"
+            )
+
+        if not isinstance(self.min_samples, int) or self.min_samples <= 0:
+            raise ValueError(
+                f"adaptive_timeout.min_samples must be greater than 0, current value: {self.min_samples}"
+            )
+
+        if not isinstance(self.history_size, int) or self.history_size < self.min_samples:
+            raise ValueError(
+                f"adaptive_timeout.history_size must be at least min_samples ({self.min_samples}), "
+                f"current value: {self.history_size}"
+            )
+
+
+@dataclass
+class IsolationConfig:
+
+    enabled: bool = True
+    cpus: List[int] = field(default_factory=list)
+    cpus_per_command: int = 2
+    cgroup: bool = True
+    cgroup_parent: str = ""
+    cpu_limit: Optional[float] = None
+    memory_limit_mb: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IsolationConfig":
+        return cls(
+            enabled=data.get("enabled", True),
+            cpus=data.get("cpus") or [],
+            cpus_per_command=data.get("cpus_per_command", 2),
+            cgroup=data.get("cgroup", True),
+            cgroup_parent=data.get("cgroup_parent") or "",
+            cpu_limit=data.get("cpu_limit"),
+            memory_limit_mb=data.get("memory_limit_mb"),
+        )
+
+    def validate(self):
+        if not isinstance(self.cpus, list) or not all(
+            isinstance(cpu, int) and cpu >= 0 for cpu in self.cpus
+        ):
+            raise ValueError("isolation.cpus must be a list of non-negative CPU numbers")
+
+        if not isinstance(self.cpus_per_command, int) or self.cpus_per_command <= 0:
+            raise ValueError(
+                f"isolation.cpus_per_command must be greater than 0, current value: {self.cpus_per_command}"
+            )
+
+        if not isinstance(self.cgroup_parent, str):
+            raise ValueError("isolation.cgroup_parent must be a path")
+
+        if self.cpu_limit is not None and (
+            not isinstance(self.cpu_limit, (int, float)) or self.cpu_limit <= 0
+        ):
+            raise ValueError(
+                f"isolation.cpu_limit must be greater than 0, current value: {self.cpu_limit}"
+            )
+
+        if self.memory_limit_mb is not None and (
+            not isinstance(self.memory_limit_mb, int) or self.memory_limit_mb <= 0
+        ):
+            raise ValueError(
+                f"isolation.memory_limit_mb must be greater than 0, current value: {self.memory_limit_mb}"
+            )
+
+
 @dataclass
 class FrameworkConfig:
 
@@ -75,6 +260,18 @@ class FrameworkConfig:
     output_dir: str = "./test_results"
     log_level: str = "INFO"
     retry_on_failure: int = 0
+    artifact_workers: int = 2
+    hook_timeout: int = 60
+    kill_grace_period: int = 5
+    reap_orphans: bool = True
+    watch_exclude: List[str] = field(default_factory=lambda: list(DEFAULT_WATCH_EXCLUDE))
+    ohpm_cache: Optional[OhpmCacheConfig] = None
+    prefetch_workers: int = 4
+    prefetch_lookahead: int = 4
+    output_store: OutputStoreConfig = field(default_factory=OutputStoreConfig)
+    toolchains: Dict[str, BuildToolsConfig] = field(default_factory=dict)
+    adaptive_timeout: Optional[AdaptiveTimeoutConfig] = None
+    isolation: Optional[IsolationConfig] = None
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "FrameworkConfig":
@@ -87,12 +284,49 @@ class FrameworkConfig:
 
         build_tools = BuildToolsConfig.from_dict(build_tools_data)
 
+        # Named alternatives to build_tools for `compare`; unspecified fields are inherited
+        toolchains_data = data.get("toolchains") or {}
+        if not isinstance(toolchains_data, dict):
+            raise ValueError("toolchains must be a dict of name to build_tools fields")
+        toolchains = {}
+        for name, fields in toolchains_data.items():
+            if not isinstance(fields, dict):
+                raise ValueError(f"toolchains.{name} must be a dict of build_tools fields")
+            try:
+                toolchains[str(name)] = BuildToolsConfig.from_dict(dict(build_tools_data, **fields))
+            except ValueError as e:
+                raise ValueError(f"toolchains.{name}: {e}")
+
+        ohpm_cache = None
+        if data.get("ohpm_cache"):
+            ohpm_cache = OhpmCacheConfig.from_dict(data["ohpm_cache"])
+
+        adaptive_timeout = None
+        if data.get("adaptive_timeout"):
+            adaptive_timeout = AdaptiveTimeoutConfig.from_dict(data["adaptive_timeout"])
+
+        isolation = None
+        if data.get("isolation"):
+            isolation = IsolationConfig.from_dict(data["isolation"])
+
         return cls(
             build_tools=build_tools,
             default_timeout=data.get("default_timeout", 300),
             output_dir=data.get("output_dir", "./test_results"),
             log_level=data.get("log_level", "INFO"),
             retry_on_failure=data.get("retry_on_failure", 0),
+            artifact_workers=data.get("artifact_workers", 2),
+            hook_timeout=data.get("hook_timeout", 60),
+            kill_grace_period=data.get("kill_grace_period", 5),
+            reap_orphans=data.get("reap_orphans", True),
+            watch_exclude=data.get("watch_exclude", list(DEFAULT_WATCH_EXCLUDE)),
+            ohpm_cache=ohpm_cache,
+            prefetch_workers=data.get("prefetch_workers", 4),
+            prefetch_lookahead=data.get("prefetch_lookahead", 4),
+            output_store=OutputStoreConfig.from_dict(data.get("output_store") or {}),
+            toolchains=toolchains,
+            adaptive_timeout=adaptive_timeout,
+            isolation=isolation,
         )
 
     def validate(self):
@@ -115,6 +349,53 @@ class FrameworkConfig:
                 f"retry_on_failure cannot be negative, current value: {self.retry_on_failure}"
             )
 
+        if self.artifact_workers <= 0:
+            raise ValueError(
+                f"artifact_workers must be greater than 0, current value: {self.artifact_workers}"
+            )
+
+        if self.hook_timeout <= 0:
+            raise ValueError(
+                f"hook_timeout must be greater than 0, current value: {self.hook_timeout}"
+            )
+
+        if self.kill_grace_period < 0:
+            raise ValueError(
+                f"kill_grace_period cannot be negative, current value: {self.kill_grace_period}"
+            )
+
+        if not isinstance(self.watch_exclude, list) or not all(
+            isinstance(p, str) for p in self.watch_exclude
+        ):
+            raise ValueError("watch_exclude must be a list of strings")
+
+        if self.ohpm_cache is not None:
+            self.ohpm_cache.validate()
+
+        self.output_store.validate()
+
+        if self.adaptive_timeout is not None:
+            self.adaptive_timeout.validate()
+
+        if self.isolation is not None:
+            self.isolation.validate()
+
+        for name, toolchain in self.toolchains.items():
+            try:
+                toolchain.validate()
+            except ValueError as e:
+                raise ValueError(f"toolchains.{name}: {e}")
+
+        if self.prefetch_workers < 0:
+            raise ValueError(
+                f"prefetch_workers cannot be negative, current value: {self.prefetch_workers}"
+            )
+
+        if self.prefetch_lookahead < 0:
+            raise ValueError(
+                f"prefetch_lookahead cannot be negative, current value: {self.prefetch_lookahead}"
+            )
+
 
 @dataclass
 class ArtifactsConfig:
@@ -150,18 +431,202 @@ class ArtifactsConfig:
                     )
 
 
+@dataclass
+class ValidationConfig:
+
+    required_patterns: List[str] = field(default_factory=list)
+    forbidden_patterns: List[str] = field(default_factory=list)
+    fail_fast_patterns: List[str] = field(default_factory=list)
+    diagnostics: List[Dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ValidationConfig":
+        return cls(
+            required_patterns=data.get("required_patterns", []),
+            forbidden_patterns=data.get("forbidden_patterns", []),
+            fail_fast_patterns=data.get("fail_fast_patterns", []),
+            diagnostics=data.get("diagnostics", []),
+        )
+
+    def validate(self, testcase_name: str):
+        for key in ["required_patterns", "forbidden_patterns", "fail_fast_patterns"]:
+            patterns = getattr(self, key)
+            if not isinstance(patterns, list):
+                raise ValueError(f"Test case '{testcase_name}' validation.{key} must be a list")
+            for pattern in patterns:
+                self._check_pattern(testcase_name, f"validation.{key}", pattern)
+
+        if not isinstance(self.diagnostics, list):
+            raise ValueError(f"Test case '{testcase_name}' validation.diagnostics must be a list")
+        for idx, diag in enumerate(self.diagnostics):
+            if not isinstance(diag, dict) or not diag.get("pattern"):
+                raise ValueError(
+                    f"Test case '{testcase_name}' validation.diagnostics[{idx}] must be a dict with a pattern"
+                )
+            self._check_pattern(testcase_name, f"validation.diagnostics[{idx}]", diag["pattern"])
+            if not any(k in diag for k in ("count", "min", "max")):
+                raise ValueError(
+                    f"Test case '{testcase_name}' validation.diagnostics[{idx}] "
+                    f"must specify at least one of: count, min, max"
+                )
+            for k in ("count", "min", "max"):
+                if k in diag and (not isinstance(diag[k], int) or diag[k] < 0):
+                    raise ValueError(
+                        f"Test case '{testcase_name}' validation.diagnostics[{idx}].{k} "
+                        f"must be a non-negative integer"
+                    )
+
+    @staticmethod
+    def _check_pattern(testcase_name: str, key: str, pattern: Any):
+        if not isinstance(pattern, str):
+            raise ValueError(f"Test case '{testcase_name}' {key} must contain only strings")
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(
+                f"Test case '{testcase_name}' {key} has invalid pattern '{pattern}': {e}"
+            )
+
+
+@dataclass
+class HookConfig:
+
+    script: str
+    timeout: Optional[int] = None
+    isolated: bool = False
+
+    TYPES = ["pre_testcase", "post_testcase", "pre_command", "post_command", "on_failure"]
+
+    @classmethod
+    def from_value(cls, value: Any) -> "HookConfig":
+        """Build from either a script path or a mapping with script/timeout/isolated"""
+        if isinstance(value, dict):
+            return cls(
+                script=value.get("script", ""),
+                timeout=value.get("timeout"),
+                isolated=value.get("isolated", False),
+            )
+        return cls(script=value)
+
+    def validate(self, testcase_name: str, hook_type: str):
+        if hook_type not in self.TYPES:
+            raise ValueError(
+                f"Test case '{testcase_name}' has unknown hook type: {hook_type}, "
+                f"must be one of: {', '.join(self.TYPES)}"
+            )
+        if not self.script or not isinstance(self.script, str):
+            raise ValueError(f"Test case '{testcase_name}' hooks.{hook_type} script cannot be empty")
+        if self.timeout is not None and self.timeout <= 0:
+            raise ValueError(f"Test case '{testcase_name}' hooks.{hook_type} timeout must be greater than 0")
+
+
+@dataclass
+class BenchmarkEditConfig:
+
+    action: str
+    file: str = ""
+    name: str = ""
+    text: str = ""
+    pattern: str = ""
+    replacement: str = ""
+
+    ACTIONS = ["touch", "append", "replace", "revert"]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BenchmarkEditConfig":
+        action = data.get("action", "")
+        file = data.get("file", "")
+        return cls(
+            action=action,
+            file=file,
+            name=data.get("name") or (f"{action} {file}" if file else action),
+            text=data.get("text", "// incremental benchmark edit"),
+            pattern=data.get("pattern", ""),
+            replacement=data.get("replacement", ""),
+        )
+
+    def validate(self, testcase_name: str, idx: int):
+        prefix = f"Test case '{testcase_name}' benchmark.edits[{idx}]"
+        if self.action not in self.ACTIONS:
+            raise ValueError(
+                f"{prefix} has invalid action: {self.action}, "
+                f"must be one of: {', '.join(self.ACTIONS)}"
+            )
+        if self.action == "revert":
+            return
+        if not self.file or not isinstance(self.file, str):
+            raise ValueError(f"{prefix} file cannot be empty")
+        if os.path.isabs(self.file) or ".." in self.file.replace("\\", "/").split("/"):
+            raise ValueError(f"{prefix} file must be relative to the test case path: {self.file}")
+        if self.action == "append" and not isinstance(self.text, str):
+            raise ValueError(f"{prefix} text must be a string")
+        if self.action == "replace":
+            if not self.pattern or not isinstance(self.pattern, str):
+                raise ValueError(f"{prefix} pattern cannot be empty")
+            if not isinstance(self.replacement, str):
+                raise ValueError(f"{prefix} replacement must be a string")
+            try:
+                re.compile(self.pattern)
+            except re.error as e:
+                raise ValueError(f"{prefix} has invalid pattern '{self.pattern}': {e}")
+
+
+@dataclass
+class BenchmarkConfig:
+
+    iterations: int = 5
+    edits: List[BenchmarkEditConfig] = field(default_factory=list)
+    rebuild: List[List[str]] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BenchmarkConfig":
+        edits = data.get("edits") or []
+        if not isinstance(edits, list) or not all(isinstance(e, dict) for e in edits):
+            raise ValueError("benchmark.edits must be a list of dicts")
+        return cls(
+            iterations=data.get("iterations", 5),
+            edits=[BenchmarkEditConfig.from_dict(e) for e in edits],
+            rebuild=data.get("rebuild", []),
+        )
+
+    def validate(self, testcase_name: str):
+        if not isinstance(self.iterations, int) or self.iterations <= 0:
+            raise ValueError(f"Test case '{testcase_name}' benchmark.iterations must be greater than 0")
+
+        if not self.edits:
+            raise ValueError(f"Test case '{testcase_name}' benchmark must have at least one edit")
+        for idx, edit in enumerate(self.edits):
+            edit.validate(testcase_name, idx)
+
+        if not isinstance(self.rebuild, list):
+            raise ValueError(f"Test case '{testcase_name}' benchmark.rebuild must be a list")
+        for idx, cmd in enumerate(self.rebuild):
+            if not isinstance(cmd, list) or not cmd or not all(isinstance(arg, str) for arg in cmd):
+                raise ValueError(
+                    f"Test case '{testcase_name}' benchmark.rebuild[{idx}] must be a non-empty "
+                    f"list of strings (command array)"
+                )
+
+
 @dataclass
 class TestCaseConfig:
 
     name: str
     path: str
     commands: List[List[str]]
+    prepare: List[List[str]] = field(default_factory=list)
     tags: List[str] = field(default_factory=list)
     dependencies: List[str] = field(default_factory=list)
     timeout: Optional[int] = None
-    hooks: Optional[Dict[str, str]] = None
+    hooks: Optional[Dict[str, HookConfig]] = None
     artifacts: Optional[ArtifactsConfig] = None
-    validation: Optional[Dict[str, Any]] = None
+    validation: Optional[ValidationConfig] = None
+    watch_paths: List[str] = field(default_factory=list)
+    inputs: List[str] = field(default_factory=list)
+    type: str = "build"
+    benchmark: Optional[BenchmarkConfig] = None
+
+    TYPES = ["build", "incremental_benchmark"]
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "TestCaseConfig":
@@ -169,16 +634,43 @@ class TestCaseConfig:
         if data.get("artifacts"):
             artifacts = ArtifactsConfig.from_dict(data["artifacts"])
         
+        validation = None
+        if data.get("validation"):
+            validation = ValidationConfig.from_dict(data["validation"])
+        
+        hooks = None
+        if data.get("hooks"):
+            if not isinstance(data["hooks"], dict):
+                raise ValueError(f"Test case '{data['name']}' hooks must be a dict")
+            hooks = {
+                hook_type: HookConfig.from_value(value)
+                for hook_type, value in data["hooks"].items()
+            }
+        
+        benchmark = None
+        if data.get("benchmark"):
+            if not isinstance(data["benchmark"], dict):
+                raise ValueError(f"Test case '{data['name']}' benchmark must be a dict")
+            try:
+                benchmark = BenchmarkConfig.from_dict(data["benchmark"])
+            except ValueError as e:
+                raise ValueError(f"Test case '{data['name']}' {e}")
+        
         return cls(
             name=data["name"],
             path=data["path"],
             commands=data["commands"],
+            prepare=data.get("prepare", []),
             tags=data.get("tags", []),
             dependencies=data.get("dependencies", []),
             timeout=data.get("timeout"),
-            hooks=data.get("hooks"),
+            hooks=hooks,
             artifacts=artifacts,
-            validation=data.get("validation"),
+            validation=validation,
+            watch_paths=data.get("watch_paths", []),
+            inputs=data.get("inputs", []),
+            type=data.get("type", "build"),
+            benchmark=benchmark,
         )
 
     def validate(self):
@@ -194,6 +686,14 @@ class TestCaseConfig:
         if not isinstance(self.commands, list):
             raise ValueError(f"Test case '{self.name}' commands must be a list")
 
+        if not isinstance(self.prepare, list):
+            raise ValueError(f"Test case '{self.name}' prepare must be a list")
+        for idx, cmd in enumerate(self.prepare):
+            if not isinstance(cmd, list) or not cmd or not all(isinstance(arg, str) for arg in cmd):
+                raise ValueError(
+                    f"Test case '{self.name}' prepare[{idx}] must be a non-empty list of strings (command array)"
+                )
+
         if self.timeout is not None and self.timeout <= 0:
             raise ValueError(f"Test case '{self.name}' timeout must be greater than 0")
 
@@ -203,9 +703,33 @@ class TestCaseConfig:
         if not isinstance(self.dependencies, list):
             raise ValueError(f"Test case '{self.name}' dependencies must be a list")
         
+        for key in ["watch_paths", "inputs"]:
+            values = getattr(self, key)
+            if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+                raise ValueError(f"Test case '{self.name}' {key} must be a list of strings")
+        
+        if self.hooks is not None:
+            for hook_type, hook in self.hooks.items():
+                hook.validate(self.name, hook_type)
+        
         # Validate artifacts configuration
         if self.artifacts is not None:
             self.artifacts.validate(self.name)
+        
+        if self.validation is not None:
+            self.validation.validate(self.name)
+        
+        if self.type not in self.TYPES:
+            raise ValueError(
+                f"Test case '{self.name}' has invalid type: {self.type}, "
+                f"must be one of: {', '.join(self.TYPES)}"
+            )
+        if self.type == "incremental_benchmark":
+            if self.benchmark is None:
+                raise ValueError(f"Test case '{self.name}' of type incremental_benchmark requires benchmark")
+            self.benchmark.validate(self.name)
+        elif self.benchmark is not None:
+            raise ValueError(f"Test case '{self.name}' benchmark requires type: incremental_benchmark")
 
 
 @dataclass
@@ -213,6 +737,7 @@ class Config:
 
     framework: FrameworkConfig
     testcases: List[TestCaseConfig]
+    tag_index: Optional[TagIndex] = field(default=None, repr=False, compare=False)
 
     def get_testcase_by_name(self, name: str) -> Optional[TestCaseConfig]:
         """Find test case config by name"""
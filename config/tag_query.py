@@ -0,0 +1,160 @@
+"""Boolean tag query engine"""
+
+import re
+from typing import Callable, Dict, List
+
+
+class TagIndex:
+    """
+    Inverted index from tag to the set of test cases carrying it.
+
+    Each set is a Python int used as a bitset, bit ``i`` standing for the
+    i-th test case, so ``and``/``or``/``not`` over any number of test cases
+    are single big-integer operations. Bitsets are materialized on first
+    use, so tags that are never queried only cost their position list.
+    """
+
+    def __init__(self, testcases: list):
+        self.names: List[str] = [tc.name for tc in testcases]
+        self.all_bits = (1 << len(self.names)) - 1
+        self.positions: Dict[str, List[int]] = {}
+        for idx, tc in enumerate(testcases):
+            for tag in set(tc.tags):
+                self.positions.setdefault(tag, []).append(idx)
+        self._bits: Dict[str, int] = {}
+
+    @staticmethod
+    def _to_bits(indices: List[int]) -> int:
+        # OR-ing shifted ints one by one is quadratic for large sets
+        if len(indices) < 64:
+            return sum(1 << i for i in indices)
+        bitmap = bytearray(indices[-1] // 8 + 1)
+        for i in indices:
+            bitmap[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(bitmap, "little")
+
+    def tag_bits(self, tag: str) -> int:
+        bits = self._bits.get(tag)
+        if bits is None:
+            bits = self._to_bits(self.positions.get(tag, []))
+            self._bits[tag] = bits
+        return bits
+
+    def names_of(self, bits: int) -> List[str]:
+        """Test case names for a bitset, in index order"""
+        names = self.names
+        binary = bin(bits)[:1:-1]
+        return [names[i] for i, c in enumerate(binary) if c == '1']
+
+    def select(self, query: "TagQuery") -> List[str]:
+        return self.names_of(query.evaluate(self))
+
+
+class TagQuery:
+    """
+    Parsed tag expression.
+
+    Grammar (lowest to highest precedence)::
+
+        expr := term (("or" | "|" | ",") term)*
+        term := factor (("and" | "&") factor)*
+        factor := ("not" | "!") factor | "(" expr ")" | TAG
+
+    A plain comma-separated list such as ``smoke,basic`` keeps its former
+    meaning of "any of these tags".
+    """
+
+    _TOKEN = re.compile(r"\s*(?:(\()|(\))|(\|)|(,)|(&)|(!)|([^\s()|,&!]+))")
+    _KEYWORDS = {"and": "&", "or": "|", "not": "!"}
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self._tokens = self._tokenize(expression)
+        self._pos = 0
+        if not self._tokens:
+            raise ValueError("Tag expression is empty")
+        self._evaluate = self._parse_expr()
+        if self._pos != len(self._tokens):
+            raise ValueError(
+                f"Invalid tag expression '{expression}': unexpected '{self._tokens[self._pos]}'"
+            )
+        del self._tokens
+
+    @classmethod
+    def _tokenize(cls, expression: str) -> List[str]:
+        tokens = []
+        pos = 0
+        expression = expression.rstrip()
+        while pos < len(expression):
+            match = cls._TOKEN.match(expression, pos)
+            if not match:
+                raise ValueError(f"Invalid tag expression '{expression}' at position {pos}")
+            token = match.group(match.lastindex)
+            if token == ",":
+                token = "|"
+            elif match.lastindex == 7:
+                token = cls._KEYWORDS.get(token.lower(), token)
+            tokens.append(token)
+            pos = match.end()
+        return tokens
+
+    def _peek(self) -> str:
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else ""
+
+    def _take(self) -> str:
+        token = self._peek()
+        if not token:
+            raise ValueError(f"Invalid tag expression '{self.expression}': unexpected end")
+        self._pos += 1
+        return token
+
+    def _parse_expr(self) -> Callable[[TagIndex], int]:
+        operands = [self._parse_term()]
+        while self._peek() == "|":
+            self._take()
+            operands.append(self._parse_term())
+        if len(operands) == 1:
+            return operands[0]
+
+        def evaluate_or(index):
+            bits = 0
+            for operand in operands:
+                bits |= operand(index)
+            return bits
+        return evaluate_or
+
+    def _parse_term(self) -> Callable[[TagIndex], int]:
+        operands = [self._parse_factor()]
+        while self._peek() == "&":
+            self._take()
+            operands.append(self._parse_factor())
+        if len(operands) == 1:
+            return operands[0]
+
+        def evaluate_and(index):
+            bits = index.all_bits
+            for operand in operands:
+                bits &= operand(index)
+            return bits
+        return evaluate_and
+
+    def _parse_factor(self) -> Callable[[TagIndex], int]:
+        token = self._take()
+        if token == "!":
+            operand = self._parse_factor()
+            return lambda index: index.all_bits & ~operand(index)
+        if token == "(":
+            inner = self._parse_expr()
+            if self._take() != ")":
+                raise ValueError(f"Invalid tag expression '{self.expression}': missing ')'")
+            return inner
+        if token in (")", "|", "&"):
+            raise ValueError(f"Invalid tag expression '{self.expression}': unexpected '{token}'")
+        return lambda index: index.tag_bits(token)
+
+    def evaluate(self, index: TagIndex) -> int:
+        """Bitset of the test cases matching this expression"""
+        return self._evaluate(index)
+
+    def __str__(self) -> str:
+        return self.expression
@@ -0,0 +1,143 @@
+"""Artifact action pipeline"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from utils.logger import get_logger
+from utils.tracing import get_tracer
+
+
+class ArtifactPipeline:
+    """
+    Background stage that runs ``artifacts.action`` commands.
+
+    Actions of a test case are queued as soon as its build commands finish
+    and run on a small worker pool, overlapping with the following test
+    cases. At most ``max_workers * 2`` cases can be in flight; further
+    submissions block until a slot frees up.
+    """
+
+    def __init__(self, executor, max_workers: int = 2, journal=None):
+        self.executor = executor
+        self.journal = journal
+        self.logger = get_logger()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="artifact"
+        )
+        self._slots = threading.BoundedSemaphore(max_workers * 2)
+        self._pending: List[Tuple[object, object]] = []
+
+    def submit(self, testcase) -> bool:
+        """Queue artifact actions of a finished test case, if it has any"""
+        if not testcase.artifacts or not testcase.artifacts.action:
+            return False
+
+        self.logger.info(
+            f"Queueing {len(testcase.artifacts.action)} artifact action(s) for: {testcase.name}"
+        )
+        tracer = get_tracer()
+        queued_ns = tracer.now_ns()
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(
+                self._run_actions, testcase, queued_ns, tracer.current_span_id()
+            )
+        except Exception:
+            self._slots.release()
+            raise
+        self._pending.append((testcase, future))
+        return True
+
+    def _run_actions(self, testcase, queued_ns: int = 0, parent_span=None):
+        tracer = get_tracer()
+        tracer.record_span(
+            "queue-wait", "queue", queued_ns, tracer.now_ns(),
+            parent=parent_span, testcase=testcase.name
+        )
+        process_groups = []
+        try:
+            with tracer.span(f"artifacts: {testcase.name}", "artifact", parent=parent_span):
+                timeout = testcase.timeout or self.executor.default_timeout
+                for idx, action in enumerate(testcase.artifacts.action, 1):
+                    self.logger.info(
+                        f"[{testcase.name}] Artifact action [{idx}/{len(testcase.artifacts.action)}]..."
+                    )
+                    success, output, exit_code, duration = self.executor.execute_command(
+                        action, testcase.path, timeout, process_groups=process_groups
+                    )
+                    testcase.add_artifact_result(action, success, output, exit_code, duration)
+                    if self.executor.output_store:
+                        self.executor.output_store.put(
+                            testcase.name, "artifact", idx, action, output, exit_code
+                        )
+                    if not success:
+                        break
+            if self.journal and not self.executor.cancelled:
+                self.journal.record_artifacts(testcase)
+        finally:
+            self.executor.reap_leaked(f"artifact actions of '{testcase.name}'", process_groups)
+            self._slots.release()
+
+    def in_flight(self) -> list:
+        """Test cases whose artifact actions are queued or running"""
+        return [testcase for testcase, future in self._pending if not future.done()]
+
+    def wait(self, names) -> list:
+        """
+        Finish the artifact actions of the named test cases ahead of ``join``.
+
+        Dependents call this before checking their dependencies, so an owner
+        only counts as passed once its actions have succeeded.
+
+        Returns:
+            list: The named test cases that had actions queued, with final status
+        """
+        settled, pending = [], []
+        for testcase, future in self._pending:
+            if testcase.name in names:
+                self._settle(testcase, future)
+                settled.append(testcase)
+            else:
+                pending.append((testcase, future))
+        self._pending = pending
+        return settled
+
+    def join(self):
+        """
+        Wait for all queued actions and fold their results into test case status.
+
+        A failed action marks its owning test case as failed so that the
+        summary and exit code reflect it; cancelled actions mark it cancelled.
+        """
+        for testcase, future in self._pending:
+            self._settle(testcase, future)
+
+        self._pending = []
+        self._pool.shutdown(wait=True)
+
+    def _settle(self, testcase, future):
+        if self.executor.cancelled and future.cancel():
+            self._slots.release()
+            self._cancel_owner(testcase)
+            return
+        try:
+            future.result()
+        except Exception as e:
+            testcase.add_artifact_result([], False, f"Artifact action exception: {e}", -1, 0.0)
+
+        failed = [r for r in testcase.artifact_results if not r['success']]
+        if failed and self.executor.cancelled:
+            self._cancel_owner(testcase)
+        elif failed and testcase.status == testcase.STATUS_PASSED:
+            error_msg = (
+                f"Artifact action failed: {failed[0]['command']}\n"
+                f"Exit code: {failed[0]['exit_code']}"
+            )
+            self.logger.error(f"Test case '{testcase.name}' failed: {error_msg}")
+            testcase.fail(error_msg)
+
+    def _cancel_owner(self, testcase):
+        self.logger.warning(f"Artifact actions of '{testcase.name}' were cancelled")
+        if testcase.status == testcase.STATUS_PASSED:
+            testcase.cancel(f"Artifact actions cancelled: {self.executor.cancel_reason}")
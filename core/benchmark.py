@@ -0,0 +1,180 @@
+"""Incremental build latency benchmark"""
+
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from utils.logger import get_logger
+from utils.run_id import new_run_id
+from utils.stats import summarize
+
+
+class IncrementalBenchmark:
+    """
+    Measures incremental rebuild latency after scripted source edits.
+
+    Runs after the test case commands, which are the full build. Within an
+    iteration the edits are applied cumulatively in order and the rebuild
+    commands run after each one; their total duration is the latency of
+    that edit. ``revert`` restores every file edited so far. Between
+    iterations the original sources are restored and rebuilt without
+    measuring, so every iteration starts from the same built tree. The
+    original contents of all edited files are restored in every case,
+    including failures and cancellation. In watch mode the watcher ignores
+    the edited files while the benchmark runs, so its own edits do not
+    trigger a rerun.
+    """
+
+    def __init__(self, executor, testcase, process_groups: List[int]):
+        self.executor = executor
+        self.testcase = testcase
+        self.config = testcase.benchmark
+        self.process_groups = process_groups
+        self.rebuild_commands = self.config.rebuild or testcase.commands
+        self.logger = get_logger()
+        self.error_message = ""
+        self._snapshot: Dict[str, bytes] = {}
+        self._dirty = set()
+
+    def run(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns:
+            Optional[Dict[str, Any]]: Results (see ``_results``), None if a rebuild
+                failed or the run was cancelled; details are in error_message
+        """
+        latencies: List[List[float]] = [[] for _ in self.config.edits]
+        edited = sorted({self._path(edit.file) for edit in self.config.edits if edit.action != "revert"})
+        watcher = self.executor.watcher
+        if watcher:
+            watcher.ignore(edited)
+        try:
+            self._take_snapshot()
+            for iteration in range(1, self.config.iterations + 1):
+                self.logger.info(
+                    f"[{self.testcase.name}] Benchmark iteration {iteration}/{self.config.iterations}"
+                )
+                for idx, edit in enumerate(self.config.edits):
+                    self._apply(edit)
+                    latency = self._rebuild(f"after edit '{edit.name}'")
+                    if latency is None:
+                        return None
+                    latencies[idx].append(latency)
+                    self.logger.info(f"    {edit.name}: {latency:.2f}s")
+
+                if self._dirty:
+                    self._restore()
+                    if self._rebuild("restoring the original sources") is None:
+                        return None
+        except (OSError, ValueError) as e:
+            self.error_message = f"Benchmark edit failed: {e}"
+            self.logger.error(self.error_message)
+            return None
+        finally:
+            self._restore()
+            if watcher:
+                watcher.unignore(edited)
+
+        return self._results(latencies)
+
+    def _take_snapshot(self):
+        for edit in self.config.edits:
+            if edit.action == "revert" or edit.file in self._snapshot:
+                continue
+            with open(self._path(edit.file), "rb") as f:
+                self._snapshot[edit.file] = f.read()
+
+    def _path(self, file: str) -> str:
+        return os.path.join(self.testcase.path, file)
+
+    def _apply(self, edit):
+        if edit.action == "revert":
+            self._restore()
+            return
+
+        path = self._path(edit.file)
+        self._dirty.add(edit.file)
+        if edit.action == "touch":
+            now = time.time()
+            os.utime(path, (now, now))
+        elif edit.action == "append":
+            with open(path, "a", encoding="utf-8", newline="") as f:
+                f.write("\n" + edit.text + "\n")
+        elif edit.action == "replace":
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                content = f.read()
+            content, count = re.subn(edit.pattern, edit.replacement, content, count=1)
+            if not count:
+                raise ValueError(f"pattern '{edit.pattern}' not found in {edit.file}")
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(content)
+
+    def _restore(self):
+        """Write back the original contents of edited files (with a new mtime, so they rebuild)"""
+        for file in sorted(self._dirty):
+            with open(self._path(file), "wb") as f:
+                f.write(self._snapshot[file])
+        self._dirty.clear()
+
+    def _rebuild(self, reason: str) -> Optional[float]:
+        total = 0.0
+        for command in self.rebuild_commands:
+            if self.executor.cancelled:
+                self.error_message = f"Command cancelled: {self.executor.cancel_reason}"
+                return None
+            success, output, exit_code, duration = self.executor.execute_command(
+                command, self.testcase.path,
+                self.executor.command_timeout(self.testcase, command),
+                process_groups=self.process_groups
+            )
+            total += duration
+            if not success:
+                # Only failed rebuilds are recorded, so the output store and journal keep their output
+                self.executor._add_command_result(
+                    self.testcase, command, success, output, exit_code, duration
+                )
+                self.error_message = (
+                    f"Rebuild failed {reason}: {command}\nExit code: {exit_code}"
+                )
+                if not self.executor.cancelled:
+                    self.logger.error(self.error_message)
+                return None
+        return total
+
+    def _results(self, latencies: List[List[float]]) -> Dict[str, Any]:
+        executed = self.testcase.executed_commands
+        # The full build is the last len(commands) results; [-0:] would take all of them
+        full_build = sum(
+            c['duration'] for c in executed[max(len(executed) - len(self.testcase.commands), 0):]
+        )
+        return {
+            'iterations': self.config.iterations,
+            'full_build': full_build,
+            'edits': [
+                dict(summarize(values), name=edit.name, action=edit.action,
+                     file=edit.file, samples=values)
+                for edit, values in zip(self.config.edits, latencies)
+            ],
+        }
+
+
+def format_results(results: Dict[str, Any]) -> List[str]:
+    width = max(24, *(len(e['name']) + 2 for e in results['edits']))
+    lines = [
+        f"Full build: {results['full_build']:.2f}s, {results['iterations']} iteration(s)",
+        f"  {'Edit':<{width}}{'mean':>9}{'stdev':>9}{'median':>9}{'p90':>9}{'min':>9}{'max':>9}",
+    ]
+    for edit in results['edits']:
+        lines.append(
+            f"  {edit['name']:<{width}}"
+            + "".join(f"{edit[k]:>8.2f}s" for k in ('mean', 'stdev', 'median', 'p90', 'min', 'max'))
+        )
+    return lines
+
+
+def write_results(results: Dict[str, Any], output_dir: str, testcase_name: str) -> str:
+    path = os.path.join(output_dir, f"benchmark_{testcase_name}_{new_run_id()}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dict(results, testcase=testcase_name), f, indent=2)
+    return path
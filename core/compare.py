@@ -0,0 +1,254 @@
+"""A/B comparison of test cases across toolchains"""
+
+import glob
+import json
+import os
+import shutil
+from dataclasses import replace
+from typing import Any, Dict, List, Optional
+
+from core.executor import Executor
+from core.isolation import CommandIsolation
+from utils.logger import get_logger
+from utils.stats import relative_delta, significance_marker, summarize, welch_t_test
+
+
+# Left out of workspace copies so every run starts from a clean tree
+WORKSPACE_EXCLUDES = ("build", ".hvigor", "oh_modules", ".preview")
+
+# Measured as artifact size when a test case has no artifacts.verify_files
+DEFAULT_ARTIFACT_PATTERNS = (
+    "**/build/**/*.hap", "**/build/**/*.har", "**/build/**/*.hsp", "**/build/**/*.app",
+)
+
+METRICS = ("duration", "cpu_seconds", "peak_rss", "artifact_size")
+
+
+class ToolchainComparison:
+    """
+    Runs every test case under each toolchain and compares the measurements.
+
+    Runs are case-major and interleaved in ABBA order (A B, B A, A B, ...),
+    so slow drift of the machine (thermal state, page cache, background
+    load) affects every toolchain alike. Each run builds a fresh copy of
+    the test case directory in its own workspace with an executor whose
+    environment comes from that toolchain only. Hooks, validation and
+    dependencies are not part of a comparison run.
+    """
+
+    def __init__(self, framework_config, toolchains: List[str], iterations: int, workspace: str):
+        self.framework_config = framework_config
+        self.toolchains = toolchains
+        self.iterations = iterations
+        self.workspace = workspace
+        self.logger = get_logger()
+        self.executors = {
+            name: Executor(
+                framework_config.default_timeout,
+                replace(framework_config, build_tools=framework_config.toolchains[name], isolation=None)
+            )
+            for name in toolchains
+        }
+        # One set of CPUs and cgroups for all toolchains
+        self.isolation = None
+        if framework_config.isolation and framework_config.isolation.enabled:
+            self.isolation = CommandIsolation(framework_config.isolation)
+            for executor in self.executors.values():
+                executor.isolation = self.isolation
+        self.runs: List[Dict[str, Any]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return any(executor.cancelled for executor in self.executors.values())
+
+    def cancel(self, reason: str):
+        for executor in self.executors.values():
+            executor.cancel(reason)
+
+    def run(self, testcases: list) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: Raw runs plus per-case statistics (see ``analyze``)
+        """
+        total = len(testcases) * self.iterations * len(self.toolchains)
+        done = 0
+        try:
+            for testcase in testcases:
+                for iteration in range(self.iterations):
+                    order = self.toolchains if iteration % 2 == 0 else list(reversed(self.toolchains))
+                    for toolchain in order:
+                        if self.cancelled:
+                            return self.analyze()
+                        done += 1
+                        self.logger.info(
+                            f"[{done}/{total}] {testcase.name} on {toolchain} "
+                            f"(iteration {iteration + 1}/{self.iterations})"
+                        )
+                        self.runs.append(self._run_once(testcase, toolchain, iteration))
+                try:
+                    os.rmdir(os.path.join(self.workspace, testcase.name))
+                except OSError:
+                    pass
+        finally:
+            if self.isolation:
+                self.isolation.close()
+        return self.analyze()
+
+    def _run_once(self, testcase, toolchain: str, iteration: int) -> Dict[str, Any]:
+        executor = self.executors[toolchain]
+        workdir = os.path.join(self.workspace, testcase.name, toolchain)
+        result = {
+            'testcase': testcase.name,
+            'toolchain': toolchain,
+            'iteration': iteration + 1,
+            'success': False,
+            'duration': 0.0,
+            'cpu_seconds': None,
+            'peak_rss': None,
+            'artifact_size': None,
+            'error': "",
+        }
+
+        try:
+            shutil.rmtree(workdir, ignore_errors=True)
+            shutil.copytree(
+                testcase.path, workdir, symlinks=True,
+                ignore=shutil.ignore_patterns(*WORKSPACE_EXCLUDES)
+            )
+        except OSError as e:
+            result['error'] = f"Failed to create workspace: {e}"
+            self.logger.error(result['error'])
+            return result
+
+        timeout = testcase.timeout or executor.default_timeout
+        peak_rss = 0
+        cpu_seconds = 0.0
+        process_groups = []
+        try:
+            for command in testcase.prepare_commands + testcase.commands:
+                usage = {}
+                success, _, exit_code, duration = executor.execute_command(
+                    command, workdir, timeout, process_groups=process_groups, usage=usage
+                )
+                result['duration'] += duration
+                peak_rss = max(peak_rss, usage.get('peak_rss', 0))
+                # Exact from the command's cgroup under isolation, sampled otherwise
+                cpu_seconds += usage.get('cpu_seconds', 0.0)
+                if not success:
+                    result['error'] = f"Command failed: {command}\nExit code: {exit_code}"
+                    return result
+
+            result['success'] = True
+            # Sampling needs /proc; elsewhere peak memory and CPU time are not reported
+            result['peak_rss'] = peak_rss or None
+            result['cpu_seconds'] = cpu_seconds or None
+            result['artifact_size'] = self._artifact_size(testcase, workdir)
+            return result
+        finally:
+            executor.reap_leaked(f"'{testcase.name}' on {toolchain}", process_groups)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    @staticmethod
+    def _artifact_size(testcase, workdir: str) -> int:
+        verify_files = testcase.artifacts.verify_files if testcase.artifacts else []
+        files = set()
+        for pattern in verify_files or DEFAULT_ARTIFACT_PATTERNS:
+            files.update(
+                path for path in glob.glob(os.path.join(workdir, pattern), recursive=True)
+                if os.path.isfile(path)
+            )
+        return sum(os.path.getsize(path) for path in files)
+
+    def analyze(self) -> Dict[str, Any]:
+        """Per-case statistics of successful runs, compared to the first toolchain"""
+        baseline = self.toolchains[0]
+        cases: Dict[str, Any] = {}
+        for run in self.runs:
+            case = cases.setdefault(run['testcase'], {
+                name: {'runs': 0, 'failed': 0, 'samples': {m: [] for m in METRICS}}
+                for name in self.toolchains
+            })
+            entry = case[run['toolchain']]
+            entry['runs'] += 1
+            if not run['success']:
+                entry['failed'] += 1
+                continue
+            for metric in METRICS:
+                if run[metric] is not None:
+                    entry['samples'][metric].append(run[metric])
+
+        for case in cases.values():
+            for entry in case.values():
+                samples = entry.pop('samples')
+                entry['metrics'] = {}
+                for metric in METRICS:
+                    entry['metrics'][metric] = dict(summarize(samples[metric]), samples=samples[metric])
+
+            base_metrics = case[baseline]['metrics']
+            for name in self.toolchains[1:]:
+                for metric in METRICS:
+                    stats = case[name]['metrics'][metric]
+                    base_stats = base_metrics[metric]
+                    if not stats['count'] or not base_stats['count']:
+                        continue
+                    p_value = welch_t_test(base_stats['samples'], stats['samples'])
+                    stats['delta_pct'] = relative_delta(base_stats['mean'], stats['mean'])
+                    stats['p_value'] = p_value
+                    stats['significance'] = significance_marker(p_value)
+
+        return {
+            'toolchains': self.toolchains,
+            'baseline': baseline,
+            'iterations': self.iterations,
+            'cases': cases,
+            'runs': self.runs,
+        }
+
+    @staticmethod
+    def write_report(report: Dict[str, Any], path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+def format_metric(metric: str, value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    if metric in ('duration', 'cpu_seconds'):
+        return f"{value:.2f}s"
+    return f"{value / (1024 * 1024):.1f}MB"
+
+
+def format_report(report: Dict[str, Any]) -> List[str]:
+    """Per-case table lines: mean ± stdev per toolchain, delta and significance vs baseline"""
+    labels = {
+        'duration': "duration", 'cpu_seconds': "CPU time",
+        'peak_rss': "peak memory", 'artifact_size': "artifact size",
+    }
+    toolchains = report['toolchains']
+    width = max(24, *(len(name) + 4 for name in toolchains))
+    lines = []
+    for case_name, case in report['cases'].items():
+        lines.append(f"{case_name}")
+        lines.append("  " + f"{'':<14}" + "".join(f"{name:<{width}}" for name in toolchains))
+        for metric in METRICS:
+            cells = []
+            for name in toolchains:
+                stats = case[name]['metrics'][metric]
+                if not stats['count']:
+                    cells.append("-")
+                    continue
+                cell = f"{format_metric(metric, stats['mean'])} ±{format_metric(metric, stats['stdev'])}"
+                if stats.get('delta_pct') is not None:
+                    cell += f" {stats['delta_pct']:+.1f}%{stats['significance']}"
+                cells.append(cell)
+            lines.append("  " + f"{labels[metric]:<14}" + "".join(f"{c:<{width}}" for c in cells))
+        failed = [f"{name}: {case[name]['failed']}/{case[name]['runs']}"
+                  for name in toolchains if case[name]['failed']]
+        if failed:
+            lines.append(f"  failed runs (excluded): {', '.join(failed)}")
+        lines.append("")
+    lines.append(
+        f"Deltas relative to {report['baseline']}; Welch's t-test: "
+        f"* p<0.05, ** p<0.01, *** p<0.001"
+    )
+    return lines
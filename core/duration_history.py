@@ -0,0 +1,98 @@
+"""Recorded command durations for adaptive timeouts"""
+
+import json
+import math
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from utils.logger import get_logger
+from utils.stats import percentile
+
+
+HISTORY_FILE = "command_history.jsonl"
+
+
+class DurationHistory:
+    """
+    Durations of successful commands, per test case and command.
+
+    Stored as JSON Lines under ``output_dir``, one line per command run, so
+    recording is a single append. Only the last ``history_size`` durations
+    of each command are kept; the file is compacted to those when opened.
+    """
+
+    def __init__(self, output_dir: str, config):
+        self.config = config
+        self.path = os.path.join(output_dir, HISTORY_FILE)
+        self.logger = get_logger()
+        self._lock = threading.Lock()
+        self._durations: Dict[str, List[float]] = {}
+        os.makedirs(output_dir, exist_ok=True)
+
+        lines = 0
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                        self._add(record["key"], float(record["duration"]))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+
+        kept = sum(len(d) for d in self._durations.values())
+        if lines > 2 * kept:
+            self._compact()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    @staticmethod
+    def key(testcase_name: str, command: list) -> str:
+        return json.dumps([testcase_name, command])
+
+    def _add(self, key: str, duration: float):
+        durations = self._durations.setdefault(key, [])
+        durations.append(duration)
+        del durations[:-self.config.history_size]
+
+    def _compact(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, durations in self._durations.items():
+                for duration in durations:
+                    f.write(json.dumps({"key": key, "duration": duration}) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def record(self, testcase_name: str, command: list, duration: float):
+        key = self.key(testcase_name, command)
+        with self._lock:
+            self._add(key, duration)
+            if not self._file.closed:
+                self._file.write(json.dumps({"key": key, "duration": round(duration, 3)}) + "\n")
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def timeout_for(self, testcase_name: str, command: list) -> Tuple[Optional[int], str]:
+        """
+        Timeout from the p99 of the recorded durations, scaled and clamped.
+
+        Returns:
+            Tuple[Optional[int], str]: (timeout, description of its source), the
+                timeout is None while fewer than min_samples durations are recorded
+        """
+        with self._lock:
+            durations = list(self._durations.get(self.key(testcase_name, command), []))
+
+        config = self.config
+        if len(durations) < config.min_samples:
+            return None, f"{len(durations)}/{config.min_samples} recorded runs"
+
+        p99 = percentile(durations, 99)
+        timeout = min(max(math.ceil(p99 * config.multiplier), config.min_timeout), config.max_timeout)
+        return timeout, (
+            f"p99 {p99:.2f}s of {len(durations)} runs x {config.multiplier:g}, "
+            f"bounds {config.min_timeout}-{config.max_timeout}s"
+        )
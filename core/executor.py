@@ -2,9 +2,15 @@
 
 import os
 import subprocess
+import threading
 import time
-from typing import Tuple, Optional
+from typing import Callable, List, Tuple, Optional
 from utils.logger import get_logger
+from utils.tracing import get_tracer
+from core.process import new_group_kwargs, terminate_tree, reap_groups, ResourceSampler
+from core.ohpm_cache import OhpmCache, is_cacheable_install
+from core.benchmark import IncrementalBenchmark, format_results, write_results
+from core.isolation import CommandIsolation, format_usage
 import platform
 
 
@@ -15,10 +21,48 @@ class Executor:
     RED = "\033[31m"
     RESET = "\033[0m"
 
-    def __init__(self, default_timeout: int = 300, framework_config=None):
+    def __init__(self, default_timeout: int = 300, framework_config=None, hook_runner=None):
         self.default_timeout = default_timeout
         self.framework_config = framework_config
+        self.hook_runner = hook_runner
         self.logger = get_logger()
+        self.kill_grace_period = framework_config.kill_grace_period if framework_config else 5
+        self.reap_orphans = framework_config.reap_orphans if framework_config else True
+        self.cancel_event = threading.Event()
+        self.cancel_reason = ""
+        self.journal = None
+        self.output_store = None
+        self.duration_history = None
+        self.watcher = None
+        self.ohpm_cache = None
+        if framework_config and framework_config.ohpm_cache and framework_config.ohpm_cache.enabled:
+            try:
+                self.ohpm_cache = OhpmCache(framework_config.ohpm_cache, self._probe_ohpm_version)
+            except OSError as e:
+                self.logger.warning(f"ohpm cache disabled, cannot use {framework_config.ohpm_cache.dir}: {e}")
+        self.isolation = None
+        if framework_config and framework_config.isolation and framework_config.isolation.enabled:
+            self.isolation = CommandIsolation(framework_config.isolation)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def cancel(self, reason: str):
+        """
+        Request cancellation of all running and future commands.
+
+        Safe to call from a signal handler or another thread: running
+        commands notice the request within half a second and terminate
+        their process groups.
+        """
+        if not self.cancel_event.is_set():
+            self.cancel_reason = reason
+            self.cancel_event.set()
+
+    def reset_cancel(self):
+        self.cancel_reason = ""
+        self.cancel_event.clear()
 
     def _get_executable_name(self, base_name: str) -> str:
 
@@ -59,8 +103,165 @@ class Executor:
 
         return cmd_list
 
+    def _probe_ohpm_version(self) -> str:
+        """ohpm version for ohpm cache keys, falling back to the resolved ohpm path"""
+        cmd_list = self._build_command_from_list(["ohpm", "-v"])
+        try:
+            completed = subprocess.run(
+                cmd_list,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                env=self._build_env(),
+                timeout=60,
+            )
+            if completed.returncode == 0 and completed.stdout.strip():
+                return completed.stdout.strip().splitlines()[-1]
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        self.logger.warning("Could not determine ohpm version, keying ohpm cache by ohpm path")
+        return os.path.realpath(cmd_list[0])
+
+    def _build_env(self) -> dict:
+        env = os.environ.copy()
+        if self.framework_config and self.framework_config.build_tools:
+            bt = self.framework_config.build_tools
+
+            if bt.ohpm_home:
+                env["OHPM_HOME"] = bt.ohpm_home
+                ohpm_bin = os.path.join(bt.ohpm_home, "bin")
+                if os.path.exists(ohpm_bin):
+                    env["PATH"] = f"{ohpm_bin}{os.pathsep}{env.get('PATH', '')}"
+            if bt.hvigor_home:
+                env["HVIGOR_HOME"] = bt.hvigor_home
+                hvigor_bin = os.path.join(bt.hvigor_home, "bin")
+                if os.path.exists(hvigor_bin):
+                    env["PATH"] = f"{hvigor_bin}{os.pathsep}{env.get('PATH', '')}"
+            if bt.deveco_sdk_home:
+                env["DEVECO_SDK_HOME"] = bt.deveco_sdk_home
+            if bt.ohos_base_sdk_home:
+                env["OHOS_BASE_SDK_HOME"] = bt.ohos_base_sdk_home
+            if bt.java_home:
+                env["JAVA_HOME"] = bt.java_home
+                java_bin = os.path.join(bt.java_home, "bin")
+                if os.path.exists(java_bin):
+                    env["PATH"] = f"{java_bin}{os.pathsep}{env.get('PATH', '')}"
+        return env
+
     def execute_command(
-        self, command: list, cwd: str, timeout: Optional[int] = None
+        self, command: list, cwd: str, timeout: Optional[int] = None,
+        on_output: Optional[Callable[[str], bool]] = None,
+        process_groups: Optional[List[int]] = None,
+        usage: Optional[dict] = None
+    ) -> Tuple[bool, str, int, float]:
+        """
+        Execute one command, streaming its output line by line.
+
+        The command runs in its own process group; on timeout or fail-fast
+        the whole group is terminated. With isolation configured the command
+        first waits for a free CPU set, is pinned to it and runs in its own
+        cgroup where available.
+
+        Args:
+            on_output: Called for every output line; returning True kills the
+                command immediately (fail-fast)
+            process_groups: If given, the command's process group id is appended
+                so the caller can reap leaked descendants later
+            usage: If given, the process group is sampled and ``peak_rss`` (bytes)
+                and ``cpu_seconds`` are stored in it; with a cgroup the exact
+                ``cpu_seconds``, ``peak_memory`` and ``oom_kills`` of the cgroup
+        """
+        if not self.isolation:
+            return self._measure_command(command, cwd, timeout, on_output, process_groups, usage)
+
+        lease = self.isolation.acquire(self.cancel_event)
+        if lease is None:
+            return False, f"Command cancelled: {self.cancel_reason}", -1, 0.0
+        try:
+            return self._measure_command(
+                command, cwd, timeout, on_output, process_groups, usage,
+                lease.started, lease.preexec_fn
+            )
+        finally:
+            accounting = lease.release()
+            if accounting:
+                self.logger.info(f"cgroup usage: {format_usage(accounting)}")
+                if usage is not None:
+                    usage.update(accounting)
+
+    def _measure_command(
+        self, command: list, cwd: str, timeout: Optional[int],
+        on_output: Optional[Callable[[str], bool]],
+        process_groups: Optional[List[int]],
+        usage: Optional[dict],
+        on_start: Optional[Callable[[subprocess.Popen], None]] = None,
+        preexec_fn: Optional[Callable[[], None]] = None
+    ) -> Tuple[bool, str, int, float]:
+        tracer = get_tracer()
+        if not tracer.enabled and usage is None:
+            return self._execute_command(
+                command, cwd, timeout, on_output, process_groups, on_start, preexec_fn
+            )
+
+        samplers = []
+        with tracer.span(" ".join(command[:2]), "command", command=command, cwd=cwd) as span:
+            counter_name = f"resources ({threading.current_thread().name})"
+
+            def trace_sample(rss, cpu, count):
+                tracer.counter(counter_name, {
+                    "rss_mb": round(rss / (1024 * 1024), 1),
+                    "cpu_s": round(cpu, 2),
+                    "processes": count,
+                })
+
+            def start_sampling(process):
+                if on_start:
+                    on_start(process)
+                span.set_args(pid=process.pid)
+                samplers.append(ResourceSampler(
+                    process.pid, on_sample=trace_sample if tracer.enabled else None
+                ).start())
+
+            try:
+                result = self._execute_command(
+                    command, cwd, timeout, on_output, process_groups, start_sampling, preexec_fn
+                )
+            finally:
+                for sampler in samplers:
+                    sampler.stop()
+            span.set_args(success=result[0], exit_code=result[2])
+            if samplers:
+                span.set_args(peak_rss_mb=round(samplers[0].peak_rss / (1024 * 1024), 1))
+                if usage is not None:
+                    usage['peak_rss'] = samplers[0].peak_rss
+                    usage['cpu_seconds'] = samplers[0].cpu_seconds
+            return result
+
+    def _execute_command(
+        self, command: list, cwd: str, timeout: Optional[int],
+        on_output: Optional[Callable[[str], bool]],
+        process_groups: Optional[List[int]],
+        on_start: Optional[Callable[[subprocess.Popen], None]] = None,
+        preexec_fn: Optional[Callable[[], None]] = None
+    ) -> Tuple[bool, str, int, float]:
+        if self.ohpm_cache and is_cacheable_install(command) and os.path.isdir(cwd) \
+                and not self.cancelled:
+            return self.ohpm_cache.run_install(
+                cwd, command[2:],
+                lambda: self._run_process(
+                    command, cwd, timeout, on_output, process_groups, on_start, preexec_fn
+                )
+            )
+        return self._run_process(command, cwd, timeout, on_output, process_groups, on_start, preexec_fn)
+
+    def _run_process(
+        self, command: list, cwd: str, timeout: Optional[int],
+        on_output: Optional[Callable[[str], bool]],
+        process_groups: Optional[List[int]],
+        on_start: Optional[Callable[[subprocess.Popen], None]],
+        preexec_fn: Optional[Callable[[], None]] = None
     ) -> Tuple[bool, str, int, float]:
         timeout = timeout or self.default_timeout
 
@@ -75,32 +276,13 @@ class Executor:
             self.logger.error(error_msg)
             return False, error_msg, -1, 0.0
 
+        if self.cancelled:
+            return False, f"Command cancelled: {self.cancel_reason}", -1, 0.0
+
         start_time = time.time()
 
         try:
-            env = os.environ.copy()
-            if self.framework_config and self.framework_config.build_tools:
-                bt = self.framework_config.build_tools
-
-                if bt.ohpm_home:
-                    env["OHPM_HOME"] = bt.ohpm_home
-                    ohpm_bin = os.path.join(bt.ohpm_home, "bin")
-                    if os.path.exists(ohpm_bin):
-                        env["PATH"] = f"{ohpm_bin}{os.pathsep}{env.get('PATH', '')}"
-                if bt.hvigor_home:
-                    env["HVIGOR_HOME"] = bt.hvigor_home
-                    hvigor_bin = os.path.join(bt.hvigor_home, "bin")
-                    if os.path.exists(hvigor_bin):
-                        env["PATH"] = f"{hvigor_bin}{os.pathsep}{env.get('PATH', '')}"
-                if bt.deveco_sdk_home:
-                    env["DEVECO_SDK_HOME"] = bt.deveco_sdk_home
-                if bt.ohos_base_sdk_home:
-                    env["OHOS_BASE_SDK_HOME"] = bt.ohos_base_sdk_home
-                if bt.java_home:
-                    env["JAVA_HOME"] = bt.java_home
-                    java_bin = os.path.join(bt.java_home, "bin")
-                    if os.path.exists(java_bin):
-                        env["PATH"] = f"{java_bin}{os.pathsep}{env.get('PATH', '')}"
+            env = self._build_env()
 
             process = subprocess.Popen(
                 cmd_list,
@@ -112,10 +294,66 @@ class Executor:
                 encoding="utf-8",
                 errors="replace",
                 env=env,
+                preexec_fn=preexec_fn,
+                **new_group_kwargs(),
             )
-
+            if process_groups is not None:
+                process_groups.append(process.pid)
+            if on_start:
+                on_start(process)
+
+            lines = []
+            aborted = []
+            finished = threading.Event()
+
+            def pump_output():
+                try:
+                    for line in process.stdout:
+                        lines.append(line)
+                        if on_output and not aborted and on_output(line):
+                            aborted.append(line)
+                            finished.set()
+                finally:
+                    finished.set()
+
+            reader = threading.Thread(target=pump_output, name="output-reader", daemon=True)
+            reader.start()
+
+            deadline = start_time + timeout
             try:
-                output, _ = process.communicate(timeout=timeout)
+                while not finished.wait(min(0.5, max(0.0, deadline - time.time()))):
+                    if process.poll() is not None:
+                        # Leader exited while descendants still hold the output pipe
+                        break
+                    if time.time() >= deadline:
+                        raise subprocess.TimeoutExpired(cmd_list, timeout)
+                    if self.cancelled:
+                        break
+
+                if self.cancelled and not finished.is_set():
+                    terminate_tree(process, self.kill_grace_period)
+                    reader.join(self.kill_grace_period)
+                    duration = time.time() - start_time
+                    error_msg = f"Command cancelled: {self.cancel_reason}"
+                    self.logger.warning(f"{error_msg} (duration: {duration:.2f}s)")
+                    return False, "".join(lines) + f"\n{error_msg}\n", -1, duration
+
+                if aborted:
+                    terminate_tree(process, self.kill_grace_period)
+                    reader.join(self.kill_grace_period)
+                    duration = time.time() - start_time
+                    error_msg = f"Command killed on fail-fast pattern: {aborted[0].rstrip()}"
+                    self.logger.error(f"{error_msg} (duration: {duration:.2f}s)")
+                    return False, "".join(lines) + f"\n{error_msg}\n", -1, duration
+
+                process.wait(max(0.0, deadline - time.time()))
+                if finished.is_set():
+                    reader.join()
+                else:
+                    self.logger.warning(
+                        "Command exited but its descendants are still running"
+                    )
+                output = "".join(lines)
                 exit_code = process.returncode
                 duration = time.time() - start_time
 
@@ -135,8 +373,8 @@ class Executor:
                 return success, output, exit_code, duration
 
             except subprocess.TimeoutExpired:
-                process.kill()
-                process.communicate()
+                terminate_tree(process, self.kill_grace_period)
+                reader.join(self.kill_grace_period)
                 duration = time.time() - start_time
                 error_msg = f"Command execution timeout (exceeded {timeout} seconds)"
                 self.logger.error(error_msg)
@@ -148,33 +386,246 @@ class Executor:
             self.logger.error(error_msg)
             return False, error_msg, -1, duration
 
-    def execute_testcase(self, testcase) -> bool:
+    def reap_leaked(self, owner: str, process_groups: List[int]):
+        """Terminate descendants that outlived their commands"""
+        if not self.reap_orphans or not process_groups:
+            return
+
+        leaked = reap_groups(process_groups, self.kill_grace_period)
+        if leaked:
+            self.logger.warning(
+                f"Reaped {len(leaked)} leaked process(es) of {owner}: "
+                f"{', '.join(str(pid) for pid in leaked)}"
+            )
+
+    def _run_hook(self, testcase, hook_type: str, **kwargs) -> bool:
+        hook = testcase.hooks.get(hook_type)
+        if not hook or not self.hook_runner:
+            return True
+
+        context = self.hook_runner.create_context(testcase, hook_type, **kwargs)
+        return self.hook_runner.run(hook, context)
+
+    def run_prepare(self, testcase) -> Tuple[bool, list, str]:
+        """
+        Run the prepare commands (dependency installation) of a test case.
+
+        Called from the prefetch stage ahead of the test case, or inline by
+        execute_testcase when the test case was not prefetched.
+
+        Returns:
+            Tuple[bool, list, str]: (success, command result tuples, error message)
+        """
+        results = []
+        process_groups = []
+        error_msg = ""
+
+        with get_tracer().span(testcase.name, "prepare", path=testcase.path):
+            for idx, command in enumerate(testcase.prepare_commands, 1):
+                if self.cancelled:
+                    error_msg = f"Command cancelled: {self.cancel_reason}"
+                    break
+
+                self.logger.info(
+                    f"[{testcase.name}] Prepare command [{idx}/{len(testcase.prepare_commands)}]..."
+                )
+                success, output, exit_code, duration = self.execute_command(
+                    command, testcase.path, self.command_timeout(testcase, command),
+                    process_groups=process_groups
+                )
+                results.append((command, success, output, exit_code, duration))
+                if not success:
+                    error_msg = f"Prepare command failed: {command}\nExit code: {exit_code}"
+                    break
+
+        self.reap_leaked(f"prepare commands of '{testcase.name}'", process_groups)
+        return not error_msg, results, error_msg
+
+    def _apply_prepare(self, testcase, prepared: Optional[tuple]) -> Tuple[str, Optional[list], str]:
+        """Record prepare results on the test case; returns (error_msg, failed_command, failed_output)"""
+        if prepared is None:
+            prepared = self.run_prepare(testcase)
+        else:
+            self.logger.info(f"Using prefetched dependencies of: {testcase.name}")
+
+        success, results, error_msg = prepared
+        for command, ok, output, exit_code, duration in results:
+            self._add_command_result(testcase, command, ok, output, exit_code, duration)
+        if success:
+            return "", None, ""
+
+        if not self.cancelled:
+            self.logger.error(error_msg)
+        if not results:
+            return error_msg, None, ""
+        return error_msg, results[-1][0], results[-1][2]
+
+    def _add_command_result(self, testcase, command: list, success: bool,
+                            output: str, exit_code: int, duration: float):
+        testcase.add_command_result(command, success, output, exit_code, duration)
+        if self.output_store:
+            self.output_store.put(
+                testcase.name, "command", len(testcase.executed_commands), command, output, exit_code
+            )
+        if self.journal:
+            self.journal.record_command(testcase, command, success, exit_code, duration)
+        # A cache restore takes a fraction of a real install, its duration would shrink the timeout
+        restored = self.ohpm_cache and is_cacheable_install(command) \
+            and self.ohpm_cache.served_from_cache(testcase.path)
+        if self.duration_history and success and not restored:
+            self.duration_history.record(testcase.name, command, duration)
+
+    def _run_benchmark(self, testcase, process_groups: List[int]) -> str:
+        """Run the incremental benchmark of a test case; returns an error message"""
+        self.logger.info(f"[{testcase.name}] Incremental build benchmark...")
+        with get_tracer().span(testcase.name, "benchmark", path=testcase.path):
+            benchmark = IncrementalBenchmark(self, testcase, process_groups)
+            results = benchmark.run()
+        if results is None:
+            return benchmark.error_message
+
+        testcase.benchmark_results = results
+        self.logger.info(f"Incremental build latency of {self.BLUE}{testcase.name}{self.RESET}:")
+        for line in format_results(results):
+            self.logger.info(line)
+        if self.framework_config:
+            try:
+                path = write_results(results, self.framework_config.output_dir, testcase.name)
+                self.logger.info(f"Benchmark results written to: {path}")
+            except OSError as e:
+                self.logger.error(f"Failed to write benchmark results: {e}")
+        return ""
+
+    def command_timeout(self, testcase, command: list) -> int:
+        """Explicit test case timeout, else the adaptive timeout, else default_timeout"""
+        if not self.duration_history:
+            return testcase.timeout or self.default_timeout
+
+        if testcase.timeout:
+            timeout, source = testcase.timeout, "test case timeout"
+        else:
+            timeout, source = self.duration_history.timeout_for(testcase.name, command)
+            if timeout is None:
+                timeout, source = self.default_timeout, f"default_timeout, {source}"
+            else:
+                source = f"adaptive, {source}"
+        self.logger.info(f"Timeout: {timeout}s ({source})")
+        return timeout
+
+    def execute_testcase(self, testcase, prepared: Optional[tuple] = None) -> bool:
+        """
+        Args:
+            prepared: Result of run_prepare if the prefetch stage already ran it
+        """
+        with get_tracer().span(testcase.name, "testcase", path=testcase.path) as span:
+            success = self._execute_testcase(testcase, prepared)
+            span.set_args(status=testcase.status)
+            return success
+
+    def _execute_testcase(self, testcase, prepared: Optional[tuple]) -> bool:
         self.logger.info("=" * 70)
         self.logger.info(f"Starting test case: {self.BLUE}{testcase.name}{self.RESET}")
         self.logger.info("=" * 70)
 
         testcase.start()
 
-        timeout = testcase.timeout or self.default_timeout
+        error_msg = ""
+        failed_command = None
+        failed_output = ""
+        validation = testcase.validator.start() if testcase.validator else None
+        process_groups = []
+        cancelled = False
 
-        all_success = True
-        for idx, command in enumerate(testcase.commands, 1):
-            self.logger.info(f"[{idx}/{len(testcase.commands)}] Executing command...")
+        if not self._run_hook(testcase, "pre_testcase"):
+            error_msg = "pre_testcase hook aborted the test case"
+            self.logger.error(error_msg)
+        else:
+            if testcase.prepare_commands:
+                error_msg, failed_command, failed_output = self._apply_prepare(testcase, prepared)
+                cancelled = bool(error_msg) and self.cancelled
+
+            for idx, command in enumerate([] if error_msg else testcase.commands, 1):
+                if self.cancelled:
+                    cancelled = True
+                    break
+
+                self.logger.info(f"[{idx}/{len(testcase.commands)}] Executing command...")
+
+                if not self._run_hook(
+                    testcase, "pre_command", command=command, command_index=idx
+                ):
+                    error_msg = f"pre_command hook aborted command: {command}"
+                    self.logger.error(error_msg)
+                    break
+
+                if validation:
+                    validation.start_command(idx)
+                success, output, exit_code, duration = self.execute_command(
+                    command, testcase.path, self.command_timeout(testcase, command),
+                    on_output=validation.feed if validation else None,
+                    process_groups=process_groups
+                )
 
-            success, output, exit_code, duration = self.execute_command(
-                command, testcase.path, timeout
+                self._add_command_result(testcase, command, success, output, exit_code, duration)
+
+                if not success and self.cancelled:
+                    cancelled = True
+                    break
+
+                if validation and validation.fatal_match:
+                    error_msg = (
+                        f"Fail-fast pattern matched in command: {command}\n"
+                        f"Line: {validation.fatal_match['line']}"
+                    )
+                    failed_command = command
+                    failed_output = output
+                    self.logger.error(error_msg)
+                    break
+
+                if not success:
+                    error_msg = (
+                        f"Command execution failed: {command}\nExit code: {exit_code}"
+                    )
+                    failed_command = command
+                    failed_output = output
+                    self.logger.error(error_msg)
+                    break
+
+                if not self._run_hook(
+                    testcase, "post_command", command=command, command_index=idx,
+                    exit_code=exit_code, output=output
+                ):
+                    error_msg = f"post_command hook reported failure for command: {command}"
+                    self.logger.error(error_msg)
+                    break
+
+        if testcase.benchmark and not error_msg and not cancelled:
+            error_msg = self._run_benchmark(testcase, process_groups)
+            cancelled = bool(error_msg) and self.cancelled
+
+        if cancelled:
+            testcase.cancel(f"Cancelled: {self.cancel_reason}")
+            self.logger.warning(
+                f"Test case {self.BLUE}{testcase.name}{self.RESET} cancelled: {self.cancel_reason}"
             )
+            self.reap_leaked(f"test case '{testcase.name}'", process_groups)
+            return False
 
-            testcase.add_command_result(command, success, output, exit_code, duration)
+        if validation:
+            validation_errors = validation.finish()
+            testcase.set_validation_results(
+                validation_errors, validation.matches, validation.diagnostic_counts()
+            )
+            if validation_errors and not error_msg:
+                error_msg = "Output validation failed: " + "; ".join(validation_errors)
+                self.logger.error(error_msg)
 
-            if not success:
-                all_success = False
-                error_msg = (
-                    f"Command execution failed: {command}\nExit code: {exit_code}"
-                )
+        if not self._run_hook(testcase, "post_testcase", failure_reason=error_msg):
+            if not error_msg:
+                error_msg = "post_testcase hook reported failure"
                 self.logger.error(error_msg)
-                testcase.finish(False, error_msg)
-                break
+
+        all_success = not error_msg
 
         if all_success:
             testcase.finish(True)
@@ -182,6 +633,13 @@ class Executor:
                 f"Test case {self.GREEN}succeeded{self.RESET}: {self.BLUE}{testcase.name}{self.RESET} (duration: {testcase.duration:.2f}s)"
             )
         else:
+            testcase.finish(False, error_msg)
+            self._run_hook(
+                testcase, "on_failure", failure_reason=error_msg,
+                failed_command=failed_command, error_output=failed_output
+            )
             self.logger.error(f"Test case {self.RED}failed{self.RESET}: {self.BLUE}{testcase.name}{self.RESET}")
 
+        self.reap_leaked(f"test case '{testcase.name}'", process_groups)
+
         return all_success
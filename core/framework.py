@@ -1,12 +1,30 @@
 """Test framework core class"""
+import logging
+import os
+import signal
+import threading
+from dataclasses import replace
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from config.loader import ConfigLoader
 from config.models import Config
+from config.tag_query import TagIndex, TagQuery
 from core.testcase import TestCase
 from core.executor import Executor
+from core.artifacts import ArtifactPipeline
+from core.compare import ToolchainComparison, format_report
+from core.prefetch import PrefetchStage
+from core.journal import JOURNAL_VERSION, RunJournal, config_fingerprint, open_journal
+from core.output_store import OutputStore
+from core.duration_history import DurationHistory
+from core.hooks import HookRunner
+from core.graph import DependencyGraph
+from core.watcher import InotifyWatcher
+from core.impact import build_path_trie, git_changed_files, literal_prefix, resolve_case_path
 from utils.logger import setup_logger
+from utils.tracing import setup_tracer, get_tracer
+from utils.run_id import new_run_id
 
 
 class TestFramework:
@@ -21,31 +39,102 @@ class TestFramework:
     BOLD = '\033[1m'
     RESET = '\033[0m'
     
-    def __init__(self, config_dir: str = ".", tags: list = None):
+    def __init__(self, config_dir: str = ".", tags: list = None, max_failures: int = 0,
+                 changed_since: str = None, repo_dir: str = ".",
+                 trace: bool = False, trace_otlp: bool = False, resume: str = None,
+                 shard: Optional[Tuple[int, int]] = None, jobs: Optional[int] = None,
+                 config: Optional[Config] = None, log_handler: Optional[logging.Handler] = None,
+                 testcases: Optional[List[TestCase]] = None):
         """
         Initialize test framework
         
         Args:
             config_dir: Configuration file directory
-            tags: List of tags to filter test cases (OR logic - any matching tag)
+            tags: Tag expression (e.g. "smoke and not slow"), or a list of tags
+                matched with OR logic
+            max_failures: Cancel the run after this many failed test cases (0 = never)
+            changed_since: Only run test cases affected by git changes since this revision
+            repo_dir: Git repository used to compute changes for changed_since
+            trace: Write a Chrome Trace Event timeline of the run to output_dir
+            trace_otlp: Also write the spans as OTLP/JSON to output_dir
+            resume: Journal of an interrupted run; finished test cases are not run again
+            shard: (index, count) with a 1-based index; only run this shard of the selection
+            jobs: Worker threads for prefetch and artifact actions, overriding
+                prefetch_workers and artifact_workers
+            config: Already loaded configuration (server mode); the configuration
+                files are not read again
+            log_handler: Additional log handler, e.g. to stream logs to a client
+            testcases: Test cases of ``config``, already validated and sorted by
+                dependencies (server mode); they are reset and reused
         """
         self.config_dir = config_dir
         self.loader = ConfigLoader(config_dir)
-        self.config: Optional[Config] = None
+        self.config: Optional[Config] = config
         self.logger = None
         self.executor = None
         self.testcases = []
-        self.filter_tags = tags or []
+        if isinstance(tags, (list, tuple)):
+            tags = ",".join(tags)
+        self.tag_expression = tags or ""
+        self.max_failures = max_failures
+        self.changed_since = changed_since
+        self.repo_dir = repo_dir
+        self.trace = trace
+        self.trace_otlp = trace_otlp
+        self.trace_files = []
+        self.resume = resume
+        self.journal: Optional[RunJournal] = None
+        self.fingerprints = {}
+        self.resumed_states = {}
+        self.shard = shard
+        self.jobs = jobs
+        self.log_handler = log_handler
+        self.preloaded_testcases = testcases
     
     def initialize(self):
         """Initialize framework"""
+        if not self._load():
+            return False
+        
+        if self.trace or self.trace_otlp:
+            setup_tracer(True)
+            run_id = new_run_id()
+            output_dir = self.config.framework.output_dir
+            if self.trace:
+                self.trace_files.append(('chrome', os.path.join(output_dir, f"trace_{run_id}.json")))
+            if self.trace_otlp:
+                self.trace_files.append(('otlp', os.path.join(output_dir, f"trace_{run_id}.otlp.json")))
+        
+        # Create executor with framework config for environment variables
+        hook_runner = HookRunner(
+            self.config_dir,
+            self.config.framework.output_dir,
+            self.config.framework.hook_timeout
+        )
+        self.executor = Executor(
+            self.config.framework.default_timeout,
+            self.config.framework,
+            hook_runner
+        )
+        
+        if not self._open_journal():
+            return False
+        
+        self._open_output_store()
+        self._open_duration_history()
+        
+        return True
+    
+    def _load(self) -> bool:
+        """Load configuration, set up logging and select the test cases to run"""
         print("="*70)
         print("Test Framework Starting")
         print("="*70)
         
         # Load all configurations
         try:
-            self.config = self.loader.load_all()
+            if self.config is None:
+                self.config = self.loader.load_all()
             print("[\u221a] Configuration loaded successfully")
             print(f"    - Framework config: log_level={self.config.framework.log_level}, "
                   f"timeout={self.config.framework.default_timeout}s")
@@ -61,59 +150,160 @@ class TestFramework:
             log_dir=self.config.framework.output_dir,
             console_output=True
         )
+        if self.log_handler:
+            self.logger.addHandler(self.log_handler)
+        
+        if self.jobs:
+            self.config = replace(self.config, framework=replace(
+                self.config.framework, prefetch_workers=self.jobs, artifact_workers=self.jobs
+            ))
         
         # Create test case objects
-        self.testcases = [TestCase(tc_config) for tc_config in self.config.testcases]
+        if self.preloaded_testcases is not None:
+            for testcase in self.preloaded_testcases:
+                testcase.reset()
+            self.testcases = list(self.preloaded_testcases)
+        else:
+            self.testcases = [TestCase(tc_config) for tc_config in self.config.testcases]
         self.logger.info(f"Loaded {len(self.testcases)} test cases")
         
         # Filter test cases by tags if specified
-        if self.filter_tags:
-            self.testcases = self._filter_by_tags(self.testcases, self.filter_tags)
-            self.logger.info(f"Filtered to {len(self.testcases)} test cases by tags: {', '.join(self.filter_tags)}")
-            print(f"    - Filtered by tags [{', '.join(self.filter_tags)}]: {len(self.testcases)} test cases")
+        if self.tag_expression:
+            try:
+                self.testcases = self._filter_by_tags(self.testcases, self.tag_expression)
+            except ValueError as e:
+                self.logger.error(f"Tag filtering failed: {e}")
+                print(f"[\u00d7] Tag filtering failed: {e}")
+                return False
+            self.logger.info(f"Filtered to {len(self.testcases)} test cases by tags: {self.tag_expression}")
+            print(f"    - Filtered by tags [{self.tag_expression}]: {len(self.testcases)} test cases")
+        
+        if self.changed_since:
+            try:
+                self.testcases = self._filter_by_changes(self.testcases, self.changed_since)
+            except ValueError as e:
+                self.logger.error(f"Change-based selection failed: {e}")
+                print(f"[\u00d7] Change-based selection failed: {e}")
+                return False
+        
+        if self.shard:
+            self.testcases = self._filter_by_shard(self.testcases, *self.shard)
         
         # Validate and sort test cases by dependencies
         try:
             self._validate_dependencies()
-            self.testcases = self._sort_by_dependencies()
+            # The selection filters keep the order of the already sorted test cases
+            if self.preloaded_testcases is None:
+                self.testcases = self._sort_by_dependencies()
             self.logger.info("Test case dependencies validated and sorted")
         except Exception as e:
             self.logger.error(f"Dependency validation failed: {e}")
             print(f"[\u00d7] Dependency validation failed: {e}")
             return False
         
-        # Create executor with framework config for environment variables
-        self.executor = Executor(
-            self.config.framework.default_timeout,
-            self.config.framework
-        )
+        return True
+    
+    def _open_output_store(self):
+        """Apply retention to stored outputs and start storing this run's outputs"""
+        store_config = self.config.framework.output_store
+        if not store_config.enabled:
+            return
+        
+        root = os.path.join(self.config.framework.output_dir, "outputs")
+        try:
+            deleted = OutputStore.prune(root, store_config.retention_days, store_config.max_size_mb)
+            if deleted:
+                self.logger.info(f"Removed {len(deleted)} expired run(s) from the output store")
+            self.executor.output_store = OutputStore(
+                root, new_run_id(), store_config.compression
+            )
+        except OSError as e:
+            self.logger.warning(f"Output store disabled: {e}")
+    
+    def _open_duration_history(self):
+        """Record command durations and derive timeouts from them (adaptive_timeout)"""
+        adaptive = self.config.framework.adaptive_timeout
+        if not adaptive or not adaptive.enabled:
+            return
+        
+        try:
+            self.executor.duration_history = DurationHistory(self.config.framework.output_dir, adaptive)
+            self.logger.info(f"Adaptive timeouts from: {self.executor.duration_history.path}")
+        except OSError as e:
+            self.logger.warning(f"Adaptive timeouts disabled: {e}")
+    
+    def _open_journal(self) -> bool:
+        """Start a new run journal, or continue the one given to resume from"""
+        try:
+            if self.resume:
+                self.resumed_states = RunJournal.finished_states(RunJournal.load(self.resume))
+            self.journal = open_journal(self.config.framework.output_dir, self.resume)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Failed to open run journal: {e}")
+            print(f"[\u00d7] Failed to open run journal: {e}")
+            return False
         
+        self.fingerprints = {
+            tc.name: config_fingerprint(tc.config, self.config.framework) for tc in self.testcases
+        }
+        self.journal.append(
+            "run_resume" if self.resume else "run_start",
+            version=JOURNAL_VERSION,
+            config_dir=os.path.abspath(self.config_dir),
+            testcases=[tc.name for tc in self.testcases],
+        )
+        self.executor.journal = self.journal
+        self.logger.info(f"Run journal: {self.journal.path}")
         return True
     
-    def _filter_by_tags(self, testcases: list, tags: list) -> list:
-
-        tc_map = {tc.name: tc for tc in testcases}
-        
-        matched = set()
-        for tc in testcases:
-            if any(tag in tc.tags for tag in tags):
-                matched.add(tc.name)
-        
-        def add_dependencies(tc_name: str, result: set):
-            """Recursively add test case and all its dependencies"""
-            if tc_name in result:
-                return
-            result.add(tc_name)
-            
-            tc = tc_map.get(tc_name)
-            if tc:
-                for dep in tc.dependencies:
-                    add_dependencies(dep, result)
+    def _restore_from_journal(self, testcases: list, completed: dict) -> set:
+        """
+        Restore test cases finished in the resumed run.
         
-        final_set = set()
-        for tc_name in matched:
-            add_dependencies(tc_name, final_set)
+        A test case is restored only if its configuration fingerprint is
+        unchanged and none of its dependencies has to run again.
+        """
+        states, self.resumed_states = self.resumed_states, {}
+        if not states:
+            return set()
+        
+        rerun = {
+            tc.name for tc in testcases
+            if tc.name not in states or states[tc.name].get("fingerprint") != self.fingerprints.get(tc.name)
+        }
+        rerun = DependencyGraph(testcases).with_dependents(rerun)
+        changed = [
+            tc.name for tc in testcases if tc.name in states and tc.name in rerun
+        ]
+        
+        restored = set()
+        for testcase in testcases:
+            if testcase.name in rerun:
+                continue
+            testcase.restore(states[testcase.name])
+            completed[testcase.name] = testcase.status == TestCase.STATUS_PASSED
+            restored.add(testcase.name)
+        
+        self.logger.info(
+            f"Resumed {len(restored)} finished test case(s) from {self.resume}, "
+            f"{len(testcases) - len(restored)} to run"
+        )
+        if changed:
+            self.logger.info(
+                f"Running again because configuration or dependencies changed: {', '.join(changed)}"
+            )
+        return restored
+    
+    def _filter_by_tags(self, testcases: list, expression: str) -> list:
+        """Select test cases matching a tag expression, plus their dependencies"""
+        query = TagQuery(expression)
         
+        index = self.config.tag_index if self.config and self.config.tag_index else None
+        if index is None or index.names != [tc.name for tc in testcases]:
+            index = TagIndex(testcases)
+        matched = set(index.select(query))
+        
+        final_set = DependencyGraph(testcases).with_dependencies(matched)
         filtered = [tc for tc in testcases if tc.name in final_set]
         
         auto_included = final_set - matched
@@ -123,6 +313,56 @@ class TestFramework:
         
         return filtered
     
+    def _filter_by_changes(self, testcases: list, rev: str) -> list:
+        """Keep test cases owning a changed file, their dependents and their dependencies"""
+        changed_files = git_changed_files(rev, self.repo_dir)
+        trie = build_path_trie(testcases)
+        
+        affected = set()
+        for path in changed_files:
+            affected |= trie.match(path)
+        
+        graph = DependencyGraph(testcases)
+        selected = graph.with_dependencies(graph.with_dependents(affected))
+        filtered = [tc for tc in testcases if tc.name in selected]
+        
+        self.logger.info(
+            f"{len(changed_files)} file(s) changed since {rev}, "
+            f"affected test cases: {', '.join(sorted(affected)) or 'none'}"
+        )
+        print(f"    - Changed since {rev}: {len(changed_files)} files, {len(filtered)} test cases selected")
+        added = selected - affected
+        if added:
+            self.logger.info(f"Included dependencies and dependents: {', '.join(sorted(added))}")
+            print(f"    - Included dependencies and dependents: {', '.join(sorted(added))}")
+        
+        return filtered
+    
+    def _filter_by_shard(self, testcases: list, index: int, count: int) -> list:
+        """
+        Keep the test cases of one shard
+        
+        Test cases connected by dependencies always land in the same shard, so
+        no shard runs another shard's work. Groups are assigned largest first
+        to the shard with the fewest test cases; every shard computes the same
+        assignment from the same selection.
+        """
+        components = sorted(
+            DependencyGraph(testcases).components(), key=lambda c: (-len(c), min(c))
+        )
+        loads = [0] * count
+        selected = set()
+        for component in components:
+            target = loads.index(min(loads))
+            loads[target] += len(component)
+            if target == index - 1:
+                selected |= component
+        
+        filtered = [tc for tc in testcases if tc.name in selected]
+        self.logger.info(f"Shard {index}/{count}: {len(filtered)} of {len(testcases)} test cases")
+        print(f"    - Shard {index}/{count}: {len(filtered)} test cases")
+        return filtered
+    
     def _validate_dependencies(self):
         """Validate test case dependencies"""
         testcase_names = {tc.name for tc in self.testcases}
@@ -186,8 +426,16 @@ class TestFramework:
         
         return sorted_testcases
     
-    def run(self):
-        if not self.testcases:
+    def run(self, testcases: list = None, completed: dict = None):
+        """
+        Run test cases in dependency order
+        
+        Args:
+            testcases: Subset of self.testcases to run (default: all), kept in sorted order
+            completed: Known results of test cases outside the subset, by name
+        """
+        testcases = self.testcases if testcases is None else testcases
+        if not testcases:
             self.logger.warning("No test cases found")
             return
         
@@ -196,23 +444,308 @@ class TestFramework:
         
         start_time = datetime.now()
         
-        completed = {}
-        
-        for testcase in self.testcases:
-            skip_reason = self._check_dependencies(testcase, completed)
-            if skip_reason:
-                self.logger.error(f"Test case '{testcase.name}' failed: {skip_reason}")
-                testcase.finish(False, skip_reason)
-                completed[testcase.name] = False
-                self.logger.info("")
-                continue
+        completed = dict(completed or {})
+        failures = 0
+        restored = self._restore_from_journal(testcases, completed)
+        artifact_pipeline = ArtifactPipeline(
+            self.executor, self.config.framework.artifact_workers, self.journal
+        )
+        prefetch = None
+        if self.config.framework.prefetch_workers > 0:
+            prefetch = PrefetchStage(
+                self.executor,
+                self.config.framework.prefetch_workers,
+                self.config.framework.prefetch_lookahead
+            )
+        previous_handler = self._install_sigint_handler()
+        
+        with get_tracer().span("run", "run", testcases=len(testcases)) as span:
+            try:
+                for position, testcase in enumerate(testcases):
+                    if testcase.name in restored:
+                        continue
+                    if self.executor.cancelled:
+                        testcase.skip(f"Cancelled: {self.executor.cancel_reason}")
+                        completed[testcase.name] = False
+                        continue
+                    
+                    if prefetch:
+                        in_flight = artifact_pipeline.in_flight()
+                        # Owners with artifact actions still running do not count as passed yet
+                        unsettled = {tc.name for tc in in_flight}
+                        settled = {
+                            name: ok for name, ok in completed.items() if name not in unsettled
+                        }
+                        prefetch.schedule(
+                            testcases, position, settled, {tc.path for tc in in_flight}
+                        )
+                    success = self._run_testcase(testcase, completed, artifact_pipeline, prefetch)
+                    if not success and testcase.status == TestCase.STATUS_FAILED:
+                        failures += 1
+                        if self.max_failures and failures >= self.max_failures:
+                            self.cancel(f"reached max failures ({self.max_failures})")
+                
+                # Artifact actions may still be running; their results decide final status
+                artifact_pipeline.join()
+            finally:
+                if prefetch:
+                    prefetch.shutdown()
+                if self.executor.isolation:
+                    self.executor.isolation.close()
+                if previous_handler is not None:
+                    signal.signal(signal.SIGINT, previous_handler)
             
-            success = self.executor.execute_testcase(testcase)
-            completed[testcase.name] = success
-            self.logger.info("")
+            span.set_args(failures=failures, cancelled=self.cancelled)
         
         total_time = (datetime.now() - start_time).total_seconds()
-        self._print_summary(total_time)
+        self._print_summary(total_time, testcases)
+        self._export_trace()
+        if self.journal:
+            self.journal.append(
+                "run_end",
+                cancelled=self.cancelled,
+                statuses={tc.name: tc.status for tc in testcases},
+            )
+    
+    def _export_trace(self):
+        """Write the recorded timeline; repeated runs (watch mode) rewrite the same files"""
+        tracer = get_tracer()
+        if not tracer.enabled:
+            return
+        for kind, path in self.trace_files:
+            try:
+                if kind == 'chrome':
+                    tracer.export_chrome(path)
+                else:
+                    tracer.export_otlp(path)
+                self.logger.info(f"Trace written to: {path}")
+            except OSError as e:
+                self.logger.error(f"Failed to write trace {path}: {e}")
+    
+    def compare(self, toolchains: list = None, iterations: int = 3,
+                workspace: str = None) -> Optional[dict]:
+        """
+        Run the selected test cases under several toolchains and compare them
+        
+        Each test case runs on its own: its dependencies are not executed and
+        hooks and validation are skipped, only its commands are measured.
+        
+        Args:
+            toolchains: Names from the toolchains config, the first is the baseline
+                (default: all, in config order)
+            iterations: Runs per test case and toolchain
+            workspace: Directory for the per-run copies of test case directories
+                (default: output_dir/compare_workspace)
+        
+        Returns:
+            Optional[dict]: The comparison report, None if it could not be started
+        """
+        if not self._load():
+            return None
+        
+        framework_config = self.config.framework
+        toolchains = toolchains or list(framework_config.toolchains)
+        unknown = [name for name in toolchains if name not in framework_config.toolchains]
+        if unknown:
+            print(f"[\u00d7] Unknown toolchain(s): {', '.join(unknown)} "
+                  f"(configured: {', '.join(framework_config.toolchains) or 'none'})")
+            return None
+        if len(set(toolchains)) < 2:
+            print("[\u00d7] Comparison needs at least two different toolchains")
+            return None
+        if iterations < 1:
+            print("[\u00d7] Iterations must be at least 1")
+            return None
+        if not self.testcases:
+            self.logger.warning("No test cases found")
+            return None
+        
+        with_dependencies = [tc.name for tc in self.testcases if tc.dependencies]
+        if with_dependencies:
+            self.logger.warning(
+                f"Dependencies are not executed in comparison runs: {', '.join(with_dependencies)}"
+            )
+        
+        workspace = workspace or os.path.join(framework_config.output_dir, "compare_workspace")
+        comparison = ToolchainComparison(framework_config, toolchains, iterations, workspace)
+        self.logger.info(
+            f"Comparing {self.BOLD}{' vs '.join(toolchains)}{self.RESET}: "
+            f"{len(self.testcases)} test case(s) x {iterations} iteration(s)"
+        )
+        
+        previous_handler = self._install_sigint_handler(comparison)
+        try:
+            report = comparison.run(self.testcases)
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGINT, previous_handler)
+        report['cancelled'] = comparison.cancelled
+        
+        self.logger.info("="*70)
+        self.logger.info(f"{self.BOLD}{self.CYAN}Toolchain Comparison{self.RESET}")
+        self.logger.info("="*70)
+        for line in format_report(report):
+            self.logger.info(line)
+        
+        report_path = os.path.join(framework_config.output_dir, f"compare_{new_run_id()}.json")
+        try:
+            ToolchainComparison.write_report(report, report_path)
+            self.logger.info(f"Comparison report written to: {report_path}")
+        except OSError as e:
+            self.logger.error(f"Failed to write comparison report {report_path}: {e}")
+        return report
+    
+    def watch(self, debounce: float = 0.5):
+        """
+        Run the selected test cases, then rerun them whenever their sources change
+        
+        Changed test cases are rerun together with their dependents (and any
+        dependency that has not passed yet). A change affecting a run that is
+        still in progress cancels it and starts over with the union of the
+        unfinished and the newly affected test cases.
+        """
+        watcher = InotifyWatcher(self.config.framework.watch_exclude)
+        self.executor.watcher = watcher
+        graph = DependencyGraph(self.testcases)
+        tc_map = {tc.name: tc for tc in self.testcases}
+        trie = build_path_trie(self.testcases)
+        roots = set()
+        for tc in self.testcases:
+            roots.add(os.path.abspath(tc.path))
+            for path in tc.config.watch_paths:
+                roots.add(os.path.abspath(resolve_case_path(tc, path)))
+            for pattern in tc.config.inputs:
+                roots.add(literal_prefix(os.path.abspath(resolve_case_path(tc, pattern))))
+        for root in sorted(roots):
+            if os.path.isdir(root):
+                watches = watcher.add_tree(root)
+                self.logger.debug(f"Watching {root} ({watches} directories)")
+        self.logger.info(f"Watching {len(roots)} test case directories")
+        
+        pending = set(tc_map)
+        running = set()
+        run_thread = None
+        
+        try:
+            while True:
+                if pending and (run_thread is None or not run_thread.is_alive()):
+                    running = self._expand_watch_selection(pending, graph, tc_map)
+                    pending = set()
+                    run_thread = self._start_watch_run(running)
+                
+                changed = watcher.wait_for_changes(0.5, debounce)
+                if not changed:
+                    continue
+                
+                affected = set()
+                for path in changed:
+                    affected |= trie.match(path)
+                if not affected:
+                    continue
+                
+                rerun = graph.with_dependents(affected)
+                self.logger.info(
+                    f"{self.CYAN}Changes detected{self.RESET} in {len(changed)} path(s), "
+                    f"rerunning: {', '.join(sorted(rerun))}"
+                )
+                
+                if run_thread is not None and run_thread.is_alive() and rerun & running:
+                    self.cancel("superseded by newer changes")
+                    run_thread.join()
+                    pending |= {
+                        name for name in running
+                        if tc_map[name].status not in (TestCase.STATUS_PASSED, TestCase.STATUS_FAILED)
+                    }
+                pending |= rerun
+        except KeyboardInterrupt:
+            self.logger.info("Watch mode stopped")
+            if run_thread is not None and run_thread.is_alive():
+                self.executor.cancel("watch mode stopped")
+                run_thread.join()
+        finally:
+            self.executor.watcher = None
+            watcher.close()
+    
+    def _expand_watch_selection(self, names: set, graph: DependencyGraph, tc_map: dict) -> set:
+        """Add dependencies that have not passed yet so the selection can run on its own"""
+        selection = set(names)
+        for name in graph.with_dependencies(names):
+            if tc_map[name].status != TestCase.STATUS_PASSED:
+                selection.add(name)
+        return selection
+    
+    def _start_watch_run(self, names: set) -> threading.Thread:
+        testcases = [tc for tc in self.testcases if tc.name in names]
+        completed = {
+            tc.name: tc.status == TestCase.STATUS_PASSED
+            for tc in self.testcases if tc.name not in names
+        }
+        for testcase in testcases:
+            testcase.reset()
+        self.executor.reset_cancel()
+        
+        thread = threading.Thread(
+            target=self.run, args=(testcases, completed), name="watch-run", daemon=True
+        )
+        thread.start()
+        return thread
+    
+    @property
+    def cancelled(self) -> bool:
+        return self.executor is not None and self.executor.cancelled
+    
+    def cancel(self, reason: str):
+        """Cancel queued test cases and terminate in-flight commands"""
+        if self.executor is None or self.executor.cancelled:
+            return
+        self.logger.warning(f"{self.YELLOW}Cancelling test run:{self.RESET} {reason}")
+        self.executor.cancel(reason)
+    
+    def _install_sigint_handler(self, target=None):
+        """
+        First Ctrl+C cancels the run gracefully, a second one aborts immediately
+        
+        Args:
+            target: Object with ``cancelled`` and ``cancel(reason)`` (default: the framework)
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return None
+        target = target or self
+        
+        def handler(signum, frame):
+            if target.cancelled:
+                signal.signal(signal.SIGINT, signal.default_int_handler)
+                raise KeyboardInterrupt
+            target.cancel("interrupted by user (SIGINT)")
+        
+        return signal.signal(signal.SIGINT, handler)
+    
+    def _run_testcase(self, testcase: TestCase, completed: dict, artifact_pipeline,
+                      prefetch: Optional[PrefetchStage] = None) -> bool:
+        for owner in artifact_pipeline.wait(testcase.dependencies):
+            completed[owner.name] = owner.status == TestCase.STATUS_PASSED
+        skip_reason = self._check_dependencies(testcase, completed)
+        if skip_reason:
+            self.logger.error(f"Test case '{testcase.name}' failed: {skip_reason}")
+            testcase.finish(False, skip_reason)
+            completed[testcase.name] = False
+            self._journal_testcase(testcase)
+            self.logger.info("")
+            return False
+        
+        prepared = prefetch.take(testcase) if prefetch else None
+        success = self.executor.execute_testcase(testcase, prepared)
+        completed[testcase.name] = success
+        artifacts_pending = success and artifact_pipeline.submit(testcase)
+        self._journal_testcase(testcase, artifacts_pending)
+        self.logger.info("")
+        return success
+    
+    def _journal_testcase(self, testcase: TestCase, artifacts_pending: bool = False):
+        if self.journal:
+            self.journal.record_testcase(
+                testcase, self.fingerprints.get(testcase.name, ""), artifacts_pending
+            )
     
     def _check_dependencies(self, testcase: TestCase, completed: dict) -> str:
         for dep in testcase.dependencies:
@@ -222,12 +755,14 @@ class TestFramework:
                 return f"dependency '{dep}' failed"
         return ""
     
-    def _print_summary(self, total_time: float):
+    def _print_summary(self, total_time: float, testcases: list = None):
 
-        passed = sum(1 for tc in self.testcases if tc.status == TestCase.STATUS_PASSED)
-        failed = sum(1 for tc in self.testcases if tc.status == TestCase.STATUS_FAILED)
-        skipped = sum(1 for tc in self.testcases if tc.status == TestCase.STATUS_SKIPPED)
-        total = len(self.testcases)
+        testcases = self.testcases if testcases is None else testcases
+        passed = sum(1 for tc in testcases if tc.status == TestCase.STATUS_PASSED)
+        failed = sum(1 for tc in testcases if tc.status == TestCase.STATUS_FAILED)
+        skipped = sum(1 for tc in testcases if tc.status == TestCase.STATUS_SKIPPED)
+        cancelled = sum(1 for tc in testcases if tc.status == TestCase.STATUS_CANCELLED)
+        total = len(testcases)
         
         self.logger.info("="*70)
         self.logger.info(f"{self.BOLD}{self.CYAN}Test Summary{self.RESET}")
@@ -236,8 +771,12 @@ class TestFramework:
         self.logger.info(f"Passed: {self.GREEN}{passed}{self.RESET}")
         self.logger.info(f"Failed: {self.RED}{failed}{self.RESET}")
         self.logger.info(f"Skipped: {self.YELLOW}{skipped}{self.RESET}")
+        if cancelled:
+            self.logger.info(f"Cancelled: {self.YELLOW}{cancelled}{self.RESET}")
+        if self.cancelled:
+            self.logger.info(f"Run cancelled: {self.YELLOW}{self.executor.cancel_reason}{self.RESET}")
         
-        effective_total = total - skipped
+        effective_total = total - skipped - cancelled
         if effective_total > 0:
             pass_rate = passed/effective_total*100
             rate_color = self.GREEN if pass_rate >= 80 else (self.YELLOW if pass_rate >= 60 else self.RED)
@@ -249,7 +788,7 @@ class TestFramework:
         self.logger.info("")
         
         self.logger.info("Test case details:")
-        for testcase in self.testcases:
+        for testcase in testcases:
             status_symbol = "\u221a" if testcase.status == TestCase.STATUS_PASSED else "\u00d7"
             
             status_colored = testcase.status
@@ -257,7 +796,7 @@ class TestFramework:
                 status_colored = f"{self.GREEN}{testcase.status}{self.RESET}"
             elif testcase.status == TestCase.STATUS_FAILED:
                 status_colored = f"{self.RED}{testcase.status}{self.RESET}"
-            elif testcase.status == TestCase.STATUS_SKIPPED:
+            elif testcase.status in (TestCase.STATUS_SKIPPED, TestCase.STATUS_CANCELLED):
                 status_colored = f"{self.YELLOW}{testcase.status}{self.RESET}"
             
             self.logger.info(
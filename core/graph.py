@@ -0,0 +1,53 @@
+"""Test case dependency graph"""
+from typing import Dict, Iterable, List, Set
+
+
+class DependencyGraph:
+    """Forward and reverse dependency edges between test cases"""
+
+    def __init__(self, testcases: list):
+        self.dependencies: Dict[str, List[str]] = {tc.name: list(tc.dependencies) for tc in testcases}
+        self.dependents: Dict[str, List[str]] = {tc.name: [] for tc in testcases}
+        for tc in testcases:
+            for dep in tc.dependencies:
+                if dep in self.dependents:
+                    self.dependents[dep].append(tc.name)
+
+    def _closure(self, names: Iterable[str], edges: Dict[str, List[str]]) -> Set[str]:
+        result = set()
+        stack = [name for name in names if name in edges]
+        while stack:
+            name = stack.pop()
+            if name in result:
+                continue
+            result.add(name)
+            stack.extend(edges.get(name, []))
+        return result
+
+    def with_dependencies(self, names: Iterable[str]) -> Set[str]:
+        """Given test cases plus everything they transitively depend on"""
+        return self._closure(names, self.dependencies)
+
+    def with_dependents(self, names: Iterable[str]) -> Set[str]:
+        """Given test cases plus everything that transitively depends on them"""
+        return self._closure(names, self.dependents)
+
+    def components(self) -> List[Set[str]]:
+        """Groups of test cases connected by dependencies in either direction"""
+        seen: Set[str] = set()
+        components = []
+        for name in self.dependencies:
+            if name in seen:
+                continue
+            component = set()
+            stack = [name]
+            while stack:
+                current = stack.pop()
+                if current in component:
+                    continue
+                component.add(current)
+                stack.extend(d for d in self.dependencies[current] if d in self.dependencies)
+                stack.extend(self.dependents[current])
+            seen |= component
+            components.append(component)
+        return components
@@ -0,0 +1,207 @@
+"""Hook runtime module"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import threading
+import traceback
+from dataclasses import dataclass, field, asdict
+from typing import List, Dict, Any, Optional
+
+from utils.logger import get_logger
+from utils.tracing import get_tracer
+
+
+@dataclass
+class HookContext:
+    """Execution context passed to a hook's ``execute(context)``"""
+
+    hook_type: str
+    testcase_name: str
+    testcase_path: str
+    framework_root: str
+    output_dir: str
+    status: str = ""
+    command: Optional[List[str]] = None
+    command_index: int = 0
+    exit_code: Optional[int] = None
+    output: str = ""
+    failure_reason: str = ""
+    failed_command: Optional[List[str]] = None
+    error_output: str = ""
+    executed_commands: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# Executed by `python -c` for isolated hooks: loads the script, rebuilds the
+# context from stdin and maps the return value to the exit code.
+_ISOLATED_RUNNER = """
+import importlib.util, json, sys, types
+spec = importlib.util.spec_from_file_location("arkts_isolated_hook", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+context = types.SimpleNamespace(**json.load(sys.stdin))
+sys.exit(1 if module.execute(context) is False else 0)
+"""
+
+
+class HookRunner:
+    """
+    Runs hook scripts configured in ``TestCaseConfig.hooks``.
+
+    Hook modules are imported once and cached, then ``execute(context)`` is
+    called in-process on a helper thread so that a timeout can be enforced.
+    A timed-out in-process hook cannot be interrupted and is left running in
+    the background; hooks that may hang or misbehave should set
+    ``isolated: true`` to run in a separate interpreter instead.
+    """
+
+    def __init__(self, base_dir: str, output_dir: str, default_timeout: int = 60):
+        self.base_dir = os.path.abspath(base_dir)
+        self.output_dir = output_dir
+        self.default_timeout = default_timeout
+        self.logger = get_logger()
+        self._modules: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def resolve_path(self, script: str) -> str:
+        """Hook script paths are relative to the configuration directory"""
+        if os.path.isabs(script):
+            return script
+        return os.path.normpath(os.path.join(self.base_dir, script))
+
+    def create_context(self, testcase, hook_type: str, **kwargs) -> HookContext:
+        return HookContext(
+            hook_type=hook_type,
+            testcase_name=testcase.name,
+            testcase_path=testcase.path,
+            framework_root=self.base_dir,
+            output_dir=self.output_dir,
+            status=testcase.status,
+            executed_commands=[
+                {k: v for k, v in result.items() if k != 'output'}
+                for result in testcase.executed_commands
+            ],
+            **kwargs,
+        )
+
+    def _load_module(self, path: str):
+        with self._lock:
+            module = self._modules.get(path)
+            if module is not None:
+                return module
+
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Hook script not found: {path}")
+
+            module_name = "arkts_hook_" + hashlib.md5(path.encode("utf-8")).hexdigest()
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            try:
+                spec.loader.exec_module(module)
+            except Exception:
+                del sys.modules[module_name]
+                raise
+
+            if not callable(getattr(module, "execute", None)):
+                del sys.modules[module_name]
+                raise AttributeError(f"Hook script has no execute(context) function: {path}")
+
+            self._modules[path] = module
+            return module
+
+    def run(self, hook, context: HookContext) -> bool:
+        """
+        Run one hook.
+
+        Returns:
+            bool: False if the hook returned False, raised, or timed out
+        """
+        path = self.resolve_path(hook.script)
+        timeout = hook.timeout or self.default_timeout
+
+        self.logger.info(f"Running {context.hook_type} hook: {path}")
+
+        with get_tracer().span(
+            context.hook_type, "hook", script=path, isolated=hook.isolated,
+            testcase=context.testcase_name
+        ) as span:
+            if hook.isolated:
+                success = self._run_isolated(path, context, timeout)
+            else:
+                success = self._run_in_process(path, context, timeout)
+            span.set_args(success=success)
+            return success
+
+    def _run_in_process(self, path: str, context: HookContext, timeout: int) -> bool:
+        try:
+            module = self._load_module(path)
+        except Exception as e:
+            self.logger.error(f"Failed to load hook {path}: {e}")
+            return False
+
+        result = {}
+
+        def target():
+            try:
+                result['value'] = module.execute(context)
+            except Exception:
+                result['error'] = traceback.format_exc()
+
+        thread = threading.Thread(target=target, name=f"hook-{context.hook_type}", daemon=True)
+        thread.start()
+        thread.join(timeout)
+
+        if thread.is_alive():
+            self.logger.error(
+                f"{context.hook_type} hook timeout (exceeded {timeout} seconds): {path}"
+            )
+            return False
+
+        if 'error' in result:
+            self.logger.error(f"{context.hook_type} hook raised an exception:\n{result['error']}")
+            return False
+
+        return result.get('value') is not False
+
+    def _run_isolated(self, path: str, context: HookContext, timeout: int) -> bool:
+        if not os.path.exists(path):
+            self.logger.error(f"Hook script not found: {path}")
+            return False
+
+        try:
+            completed = subprocess.run(
+                [sys.executable, "-c", _ISOLATED_RUNNER, path],
+                input=json.dumps(context.to_dict()),
+                cwd=context.testcase_path if os.path.isdir(context.testcase_path) else None,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            self.logger.error(
+                f"{context.hook_type} hook timeout (exceeded {timeout} seconds): {path}"
+            )
+            return False
+        except OSError as e:
+            self.logger.error(f"{context.hook_type} hook could not be started: {path}: {e}")
+            return False
+
+        if completed.stdout:
+            self.logger.info(f"Hook output:\n{completed.stdout.rstrip()}")
+
+        if completed.returncode != 0:
+            self.logger.error(
+                f"{context.hook_type} hook failed (exit code: {completed.returncode}): {path}"
+            )
+            return False
+        return True
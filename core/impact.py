@@ -0,0 +1,128 @@
+"""Change-based test impact selection"""
+
+import fnmatch
+import glob
+import os
+import re
+import subprocess
+from typing import Dict, List, Set
+
+
+class _TrieNode:
+
+    __slots__ = ('children', 'owners', 'globs')
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.owners: Set[str] = set()
+        self.globs: List[tuple] = []
+
+
+def _normalize(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _components(path: str) -> List[str]:
+    return [part for part in path.split(os.sep) if part]
+
+
+class PathTrie:
+    """
+    Maps file paths to the test cases that own them.
+
+    Plain paths are stored as prefixes: every file below them matches.
+    Glob patterns are precompiled and stored at the node of their literal
+    leading directories, so they are only tried for files below that node
+    and a lookup costs one walk down the path components.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def _node(self, path: str) -> _TrieNode:
+        node = self.root
+        for part in _components(path):
+            node = node.children.setdefault(part, _TrieNode())
+        return node
+
+    def add_prefix(self, path: str, owner: str):
+        self._node(_normalize(path)).owners.add(owner)
+
+    def add_glob(self, pattern: str, owner: str):
+        pattern = _normalize(pattern)
+        if not glob.has_magic(pattern):
+            self.add_prefix(pattern, owner)
+            return
+        regex = re.compile(fnmatch.translate(pattern))
+        self._node(literal_prefix(pattern)).globs.append((regex, owner))
+
+    def match(self, path: str) -> Set[str]:
+        """Return the owners of every prefix or glob matching ``path``"""
+        path = _normalize(path)
+        owners = set()
+        node = self.root
+        for part in _components(path):
+            node = node.children.get(part)
+            if node is None:
+                break
+            if node.owners:
+                owners |= node.owners
+            for regex, owner in node.globs:
+                if owner not in owners and regex.match(path):
+                    owners.add(owner)
+        return owners
+
+
+def literal_prefix(pattern: str) -> str:
+    """Leading directories of a glob pattern that contain no wildcard"""
+    parts = []
+    for part in pattern.split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return os.sep.join(parts) or os.sep
+
+
+def resolve_case_path(testcase, path: str) -> str:
+    """watch_paths and inputs are relative to the test case path"""
+    if os.path.isabs(path):
+        return path
+    return os.path.join(testcase.path, path)
+
+
+def build_path_trie(testcases: list) -> PathTrie:
+    trie = PathTrie()
+    for tc in testcases:
+        trie.add_prefix(tc.path, tc.name)
+        for path in tc.config.watch_paths:
+            trie.add_prefix(resolve_case_path(tc, path), tc.name)
+        for pattern in tc.config.inputs:
+            trie.add_glob(resolve_case_path(tc, pattern), tc.name)
+    return trie
+
+
+def git_changed_files(rev: str, repo_dir: str = ".") -> List[str]:
+    """
+    Absolute paths changed in the working tree of ``repo_dir`` since ``rev``,
+    including untracked files. Renames are reported as delete plus add.
+    """
+    def git(cwd: str, *args) -> str:
+        try:
+            return subprocess.run(
+                ["git", "-C", cwd] + list(args),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                check=True,
+            ).stdout
+        except FileNotFoundError:
+            raise ValueError("git executable not found")
+        except subprocess.CalledProcessError as e:
+            raise ValueError(f"git {' '.join(args)} failed: {e.stderr.strip()}")
+
+    toplevel = git(repo_dir, "rev-parse", "--show-toplevel").strip()
+    # -z: names are NUL-terminated and not quoted, so non-ASCII paths stay intact
+    names = git(toplevel, "diff", "--name-only", "-z", "--no-renames", rev, "--").split("\0")
+    names += git(toplevel, "ls-files", "-z", "--others", "--exclude-standard").split("\0")
+    return sorted({os.path.join(toplevel, name) for name in names if name})
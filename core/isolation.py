@@ -0,0 +1,396 @@
+"""CPU pinning and cgroup v2 limits for low-noise command execution"""
+
+import errno
+import itertools
+import os
+import threading
+from typing import Dict, List, Optional
+
+from utils.logger import get_logger
+
+
+CGROUP_MOUNT = "/sys/fs/cgroup"
+CONTROLLERS = ("cpu", "memory")
+CPU_PERIOD_US = 100000
+
+
+def available_cpus() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def format_cpus(cpus: List[int]) -> str:
+    """Compact CPU list in taskset notation, e.g. ``0-3,6``"""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def own_cgroup() -> Optional[str]:
+    """Directory of the framework's own cgroup, None without a cgroup v2 hierarchy"""
+    if not os.path.exists(os.path.join(CGROUP_MOUNT, "cgroup.controllers")):
+        return None
+    try:
+        with open("/proc/self/cgroup", "r") as f:
+            for line in f:
+                if line.startswith("0::"):
+                    return os.path.join(CGROUP_MOUNT, line[3:].strip().lstrip("/"))
+    except OSError:
+        pass
+    return None
+
+
+def _read(path: str) -> str:
+    with open(path, "r") as f:
+        return f.read()
+
+
+def _write(path: str, value: str):
+    with open(path, "w") as f:
+        f.write(value)
+
+
+class CpuSets:
+    """Disjoint CPU sets, each held by one running command at a time"""
+
+    def __init__(self, cpus: List[int], per_command: int):
+        # CPUs that do not fill a whole set stay free for the framework itself
+        self._free = [cpus[i:i + per_command] for i in range(0, len(cpus) - per_command + 1, per_command)]
+        self.count = len(self._free)
+        self._cond = threading.Condition()
+
+    def acquire(self, cancel_event: threading.Event) -> Optional[List[int]]:
+        """Wait for a free set; None if cancelled while waiting"""
+        with self._cond:
+            while not self._free:
+                if cancel_event.is_set():
+                    return None
+                self._cond.wait(0.5)
+            return self._free.pop(0)
+
+    def release(self, cpus: List[int]):
+        with self._cond:
+            self._free.append(cpus)
+            self._free.sort()
+            self._cond.notify()
+
+
+class CgroupRunGroup:
+    """
+    cgroup of one run under ``parent``, with a child group per command.
+
+    The controllers of CONTROLLERS that the parent offers are enabled for
+    the command groups. cgroup v2 only allows that while the parent has no
+    processes of its own, so if the framework itself is the only member of
+    the parent it moves into a ``framework`` leaf of the run group for the
+    duration of the run.
+    """
+
+    def __init__(self, parent: str):
+        self.parent = parent
+        self.path = os.path.join(parent, f"arkts-test-framework-{os.getpid()}")
+        self.controllers = set()
+        self._moved_self = False
+        self._pending: List[str] = []
+        self._seq = itertools.count(1)
+
+        os.makedirs(self.path, exist_ok=True)
+        wanted = [c for c in CONTROLLERS if c in _read(os.path.join(parent, "cgroup.controllers")).split()]
+        if wanted:
+            self._enable_in_parent(wanted)
+        offered = _read(os.path.join(self.path, "cgroup.controllers")).split()
+        for controller in wanted:
+            if controller not in offered:
+                continue
+            try:
+                _write(os.path.join(self.path, "cgroup.subtree_control"), f"+{controller}")
+                self.controllers.add(controller)
+            except OSError:
+                pass
+
+    def _enable_in_parent(self, controllers: List[str]):
+        control = os.path.join(self.parent, "cgroup.subtree_control")
+        enabled = _read(control).split()
+        missing = " ".join(f"+{c}" for c in controllers if c not in enabled)
+        if not missing:
+            return
+        try:
+            _write(control, missing)
+            return
+        except OSError as e:
+            if e.errno != errno.EBUSY or self.parent != own_cgroup():
+                return
+
+        leaf = os.path.join(self.path, "framework")
+        os.makedirs(leaf, exist_ok=True)
+        _write(os.path.join(leaf, "cgroup.procs"), str(os.getpid()))
+        self._moved_self = True
+        try:
+            _write(control, missing)
+        except OSError:
+            # Other processes share the cgroup, limits stay unavailable
+            pass
+
+    def create(self, cpu_limit: Optional[float], memory_limit_mb: Optional[int]) -> str:
+        path = os.path.join(self.path, f"command-{next(self._seq)}")
+        os.mkdir(path)
+        if cpu_limit and "cpu" in self.controllers:
+            _write(os.path.join(path, "cpu.max"), f"{int(cpu_limit * CPU_PERIOD_US)} {CPU_PERIOD_US}")
+        if memory_limit_mb and "memory" in self.controllers:
+            _write(os.path.join(path, "memory.max"), str(memory_limit_mb * 1024 * 1024))
+        return path
+
+    @staticmethod
+    def usage(path: str) -> Dict[str, float]:
+        """CPU time of everything that ran in the group, peak memory and OOM kills where available"""
+        usage = {}
+        try:
+            for line in _read(os.path.join(path, "cpu.stat")).splitlines():
+                key, _, value = line.partition(" ")
+                if key == "usage_usec":
+                    usage['cpu_seconds'] = int(value) / 1e6
+        except (OSError, ValueError):
+            pass
+        try:
+            usage['peak_memory'] = int(_read(os.path.join(path, "memory.peak")))
+        except (OSError, ValueError):
+            pass
+        try:
+            for line in _read(os.path.join(path, "memory.events")).splitlines():
+                key, _, value = line.partition(" ")
+                if key == "oom_kill" and int(value):
+                    usage['oom_kills'] = int(value)
+        except (OSError, ValueError):
+            pass
+        return usage
+
+    def remove(self, path: str):
+        """Remove a command group; while leaked processes keep it busy, retry on close"""
+        try:
+            os.rmdir(path)
+        except OSError:
+            self._pending.append(path)
+
+    def close(self):
+        for path in self._pending:
+            try:
+                os.rmdir(path)
+            except OSError:
+                pass
+        self._pending = []
+        if self._moved_self:
+            try:
+                _write(os.path.join(self.parent, "cgroup.procs"), str(os.getpid()))
+                os.rmdir(os.path.join(self.path, "framework"))
+            except OSError:
+                pass
+        try:
+            os.rmdir(self.path)
+        except OSError:
+            pass
+
+
+class CommandLease:
+    """CPU set and cgroup of one running command"""
+
+    def __init__(self, isolation: "CommandIsolation", cpus: Optional[List[int]], cgroup: Optional[str]):
+        self.isolation = isolation
+        self.cpus = cpus
+        self.cgroup = cgroup
+        self.joined = False
+        self._procs_path = os.path.join(cgroup, "cgroup.procs") if cgroup else None
+
+    @property
+    def preexec_fn(self):
+        """Popen ``preexec_fn`` confining the command, None if there is nothing to apply"""
+        return self._confine if self.cpus or self.cgroup else None
+
+    def _confine(self):
+        """
+        Pin the child and move it into the cgroup between fork and exec.
+
+        The command and everything it forks are confined from their first
+        instruction. This runs in the forked child of a threaded process, so
+        it only makes plain system calls: no locks, no logging, no raising.
+        Whether the cgroup move worked is checked by ``started`` in the parent.
+        """
+        if self.cpus:
+            try:
+                os.sched_setaffinity(0, self.cpus)
+            except OSError:
+                pass
+        if self._procs_path:
+            try:
+                fd = os.open(self._procs_path, os.O_WRONLY)
+                try:
+                    os.write(fd, str(os.getpid()).encode())
+                finally:
+                    os.close(fd)
+            except OSError:
+                pass
+
+    def started(self, process):
+        """Popen ``on_start``: verify the command really runs in its cgroup"""
+        if not self.cgroup:
+            return
+        expected = "/" + os.path.relpath(self.cgroup, CGROUP_MOUNT)
+        try:
+            # Not yet waited for, so readable even if the command already exited
+            with open(f"/proc/{process.pid}/cgroup", "r") as f:
+                actual = next((line[3:].strip() for line in f if line.startswith("0::")), None)
+        except OSError:
+            actual = expected
+        self.joined = actual == expected
+        if not self.joined:
+            self.isolation.disable_cgroup(f"commands cannot be moved into {self.cgroup}")
+
+    def release(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: cgroup accounting of the command, empty without a cgroup
+        """
+        usage = {}
+        if self.cgroup:
+            group = self.isolation.cgroup
+            if self.joined:
+                usage = CgroupRunGroup.usage(self.cgroup)
+                # A command too short to register any CPU time has no meaningful accounting
+                if not usage.get('cpu_seconds'):
+                    usage = {}
+            if group:
+                group.remove(self.cgroup)
+            else:
+                try:
+                    os.rmdir(self.cgroup)
+                except OSError:
+                    pass
+        if self.cpus:
+            self.isolation.cpu_sets.release(self.cpus)
+        return usage
+
+
+class CommandIsolation:
+    """
+    Dedicated CPUs and resource limits for every running command.
+
+    The configured CPUs are split into sets of ``cpus_per_command``; each
+    running command holds one set and is pinned to it with
+    ``sched_setaffinity``, so concurrently running commands never share
+    CPUs. Commands wait for a free set, which bounds how many run at once.
+    Where cgroup v2 is writable every command also runs in its own group
+    with the configured limits, and its CPU time and peak memory are read
+    from the group. Without the required privileges or platform support
+    the missing part is skipped with a warning.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.logger = get_logger()
+        self.cpu_sets: Optional[CpuSets] = None
+        self.cgroup: Optional[CgroupRunGroup] = None
+        self._cgroup_enabled = config.cgroup
+        self._lock = threading.Lock()
+
+        if not hasattr(os, "sched_setaffinity"):
+            self.logger.warning("CPU pinning is not supported on this platform")
+            return
+
+        available = available_cpus()
+        cpus = [cpu for cpu in config.cpus if cpu in available] if config.cpus else available
+        unavailable = sorted(set(config.cpus) - set(available))
+        if unavailable:
+            self.logger.warning(f"Ignoring CPUs not available to the framework: {format_cpus(unavailable)}")
+        if not cpus:
+            self.logger.warning("CPU pinning disabled: none of the configured CPUs is available")
+            return
+
+        per_command = config.cpus_per_command
+        if per_command > len(cpus):
+            self.logger.warning(
+                f"isolation.cpus_per_command ({per_command}) exceeds the {len(cpus)} available CPU(s), "
+                f"commands share one set"
+            )
+            per_command = len(cpus)
+        self.cpu_sets = CpuSets(cpus, per_command)
+        self.logger.info(
+            f"CPU isolation: {self.cpu_sets.count} set(s) of {per_command} CPU(s) from {format_cpus(cpus)}"
+        )
+
+    def _cgroup_group(self) -> Optional[CgroupRunGroup]:
+        with self._lock:
+            if not self._cgroup_enabled:
+                return None
+            if self.cgroup:
+                return self.cgroup
+
+            parent = self.config.cgroup_parent or own_cgroup()
+            if not parent:
+                self._cgroup_enabled = False
+                self.logger.warning("cgroup isolation unavailable: no cgroup v2 hierarchy")
+                return None
+            try:
+                self.cgroup = CgroupRunGroup(parent)
+            except OSError as e:
+                self._cgroup_enabled = False
+                self.logger.warning(f"cgroup isolation unavailable: {e}")
+                return None
+
+            missing = [c for c in CONTROLLERS if c not in self.cgroup.controllers]
+            if missing:
+                self.logger.warning(
+                    f"cgroup controller(s) not available: {', '.join(missing)}; "
+                    f"their limits and accounting are skipped"
+                )
+            self.logger.info(f"Commands run in cgroups under: {self.cgroup.path}")
+            return self.cgroup
+
+    def disable_cgroup(self, reason: str):
+        with self._lock:
+            if not self._cgroup_enabled:
+                return
+            self._cgroup_enabled = False
+        self.logger.warning(f"cgroup isolation disabled, {reason}")
+
+    def acquire(self, cancel_event: threading.Event) -> Optional[CommandLease]:
+        """
+        Returns:
+            Optional[CommandLease]: The lease of the next command, None if
+                cancelled while waiting for a CPU set
+        """
+        cpus = None
+        if self.cpu_sets:
+            cpus = self.cpu_sets.acquire(cancel_event)
+            if cpus is None:
+                return None
+
+        path = None
+        group = self._cgroup_group()
+        if group:
+            try:
+                path = group.create(self.config.cpu_limit, self.config.memory_limit_mb)
+            except OSError as e:
+                self.disable_cgroup(f"cannot create command cgroup: {e}")
+        return CommandLease(self, cpus, path)
+
+    def close(self):
+        """Remove the cgroups of the run; a later command sets them up again"""
+        with self._lock:
+            group, self.cgroup = self.cgroup, None
+        if group:
+            group.close()
+
+
+def format_usage(usage: Dict[str, float]) -> str:
+    parts = []
+    if 'cpu_seconds' in usage:
+        parts.append(f"CPU time {usage['cpu_seconds']:.2f}s")
+    if 'peak_memory' in usage:
+        parts.append(f"peak memory {usage['peak_memory'] / (1024 * 1024):.1f}MB")
+    if usage.get('oom_kills'):
+        parts.append(f"{usage['oom_kills']} OOM kill(s), memory limit reached")
+    return ", ".join(parts)
@@ -0,0 +1,165 @@
+"""Crash-safe run journal"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+from utils.logger import get_logger
+from utils.run_id import new_run_id
+
+
+JOURNAL_VERSION = 1
+
+
+def config_fingerprint(testcase_config, framework_config) -> str:
+    """Hash of everything that influences a test case result"""
+    data = {
+        "testcase": asdict(testcase_config),
+        "build_tools": asdict(framework_config.build_tools),
+    }
+    encoded = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class RunJournal:
+    """
+    Append-only JSON Lines journal of a run.
+
+    Every command, test case and artifact completion is appended as one line
+    and fsync'd before execution continues, so after a crash or reboot the
+    journal holds every result that was reported. A torn last line from a
+    crash mid-write is ignored when loading.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = get_logger()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        if self._file.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+            if torn:
+                # Terminate a line torn by a crash so the next record stays parseable
+                self._file.write("\n")
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def append(self, event: str, **data):
+        record = {"event": event, "time": time.time()}
+        record.update(data)
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def record_command(self, testcase, command: list, success: bool, exit_code: int, duration: float):
+        self.append(
+            "command", testcase=testcase.name, index=len(testcase.executed_commands),
+            command=command, success=success, exit_code=exit_code, duration=duration
+        )
+
+    def record_testcase(self, testcase, fingerprint: str, artifacts_pending: bool = False):
+        self.append(
+            "testcase", testcase=testcase.name, status=testcase.status,
+            fingerprint=fingerprint,
+            duration=testcase.duration,
+            error_message=testcase.error_message,
+            start_time=testcase.start_time.isoformat() if testcase.start_time else None,
+            end_time=testcase.end_time.isoformat() if testcase.end_time else None,
+            artifacts_pending=artifacts_pending,
+        )
+
+    def record_artifacts(self, testcase):
+        self.append(
+            "artifacts", testcase=testcase.name,
+            success=all(r['success'] for r in testcase.artifact_results),
+            results=[
+                {
+                    'command': r['command'], 'success': r['success'],
+                    'exit_code': r['exit_code'], 'duration': r['duration'],
+                }
+                for r in testcase.artifact_results
+            ],
+        )
+
+    @staticmethod
+    def load(path: str) -> List[Dict[str, Any]]:
+        """Read all intact records of a journal"""
+        records = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and "event" in record:
+                    records.append(record)
+        if not records or records[0].get("event") != "run_start":
+            raise ValueError(f"Not a run journal: {path}")
+        if records[0].get("version") != JOURNAL_VERSION:
+            raise ValueError(
+                f"Unsupported journal version {records[0].get('version')} in {path}"
+            )
+        return records
+
+    @staticmethod
+    def finished_states(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Final state of every test case that finished (PASSED or FAILED).
+
+        Commands recorded for an attempt are attached to it; a test case
+        whose artifact actions were still pending when the journal ends is
+        not considered finished.
+        """
+        commands: Dict[str, list] = {}
+        states: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            name = record.get("testcase")
+            event = record["event"]
+            if event == "command":
+                # Index 1 starts a new attempt; drop commands of an interrupted one
+                if record.get("index") == 1:
+                    commands[name] = []
+                commands.setdefault(name, []).append(record)
+            elif event == "testcase":
+                state = dict(record)
+                state["commands"] = commands.pop(name, [])
+                state["artifact_results"] = []
+                states[name] = state
+            elif event == "artifacts" and name in states:
+                state = states[name]
+                state["artifacts_pending"] = False
+                state["artifact_results"] = record.get("results", [])
+                if not record.get("success") and state["status"] == "PASSED":
+                    failed = next(r for r in state["artifact_results"] if not r["success"])
+                    state["status"] = "FAILED"
+                    state["error_message"] = (
+                        f"Artifact action failed: {failed['command']}\n"
+                        f"Exit code: {failed['exit_code']}"
+                    )
+        return {
+            name: state for name, state in states.items()
+            if state["status"] in ("PASSED", "FAILED") and not state.get("artifacts_pending")
+        }
+
+
+def open_journal(output_dir: str, resume_path: Optional[str] = None) -> RunJournal:
+    """Continue ``resume_path`` or start a new journal in ``output_dir``"""
+    if resume_path:
+        return RunJournal(resume_path)
+    return RunJournal(os.path.join(output_dir, f"journal_{new_run_id()}.jsonl"))
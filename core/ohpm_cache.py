@@ -0,0 +1,420 @@
+"""Shared ohpm dependency cache"""
+
+import errno
+import hashlib
+import json
+import os
+import shutil
+import stat
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, entries are still published atomically
+    fcntl = None
+
+
+LOCKFILE_NAME = "oh-package-lock.json5"
+MODULES_DIR = "oh_modules"
+
+# Directories never searched for lockfiles or oh_modules
+_SKIP_DIRS = {"build", ".hvigor", "node_modules", ".git", ".idea", ".preview", ".cxx", MODULES_DIR}
+
+# ioctl(dest_fd, FICLONE, src_fd) shares extents copy-on-write (btrfs, xfs)
+_FICLONE = 0x40049409
+
+
+def is_cacheable_install(command: list) -> bool:
+    """``ohpm install``/``ohpm i`` without explicit packages, which only installs the lockfile"""
+    return (
+        len(command) >= 2
+        and command[0] == "ohpm"
+        and command[1] in ("install", "i")
+        and all(arg.startswith("-") for arg in command[2:])
+    )
+
+
+class OhpmCache:
+    """
+    Content store of installed ``oh_modules`` trees keyed by lockfile hash.
+
+    The key covers every ``oh-package-lock.json5`` of the project, the
+    install arguments and the ohpm version, so a hit reproduces exactly what
+    ``ohpm install`` would produce. Layout below ``cache_dir``::
+
+        entries/<key>/meta.json      size, directories and file manifest
+        entries/<key>/.last_used     mtime drives LRU eviction
+        entries/<key>/modules/...    the oh_modules directories
+        locks/<key>.lock             flock: shared while restoring,
+                                     exclusive while filling or evicting
+        tmp/                         staging area
+
+    Entries are built in ``tmp`` and published with a single rename, so a
+    reader never sees a partial entry and concurrent fillers of the same key
+    simply keep the first one published.
+    """
+
+    def __init__(self, config, version_probe: Callable[[], str]):
+        self.logger = get_logger()
+        self.config = config
+        self.cache_dir = os.path.abspath(os.path.expanduser(config.dir))
+        self.max_size = config.max_size_mb * 1024 * 1024
+        self.link_mode = config.link
+        self._version_probe = version_probe
+        self._version = None
+        self._version_lock = threading.Lock()
+        # Project directories whose last install was restored from the cache
+        self._served = set()
+        for sub in ("entries", "locks", "tmp"):
+            os.makedirs(os.path.join(self.cache_dir, sub), exist_ok=True)
+        if self.link_mode in ("auto", "reflink") and not self._probe_reflink():
+            self.logger.info(
+                f"ohpm cache: {self.cache_dir} does not support reflinks, "
+                f"entries are restored by a full copy (see ohpm_cache.link)"
+            )
+
+    def _probe_reflink(self) -> bool:
+        probe = os.path.join(self.cache_dir, "tmp", f"reflink-probe.{uuid.uuid4().hex[:8]}")
+        try:
+            with open(probe, "wb") as f:
+                f.write(b"\0")
+            return self._reflink(probe, f"{probe}.clone")
+        except OSError:
+            return False
+        finally:
+            for path in (probe, f"{probe}.clone"):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    @property
+    def version(self) -> str:
+        with self._version_lock:
+            if self._version is None:
+                self._version = self._version_probe()
+        return self._version
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, "entries", key)
+
+    @contextmanager
+    def _locked(self, name: str, exclusive: bool, blocking: bool = True):
+        """Yield True if the lock was taken (always True without fcntl)"""
+        if fcntl is None:
+            yield True
+            return
+        path = os.path.join(self.cache_dir, "locks", f"{name}.lock")
+        with open(path, "a") as f:
+            flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+            if not blocking:
+                flags |= fcntl.LOCK_NB
+            try:
+                fcntl.flock(f, flags)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _scan(project_dir: str) -> Tuple[List[str], List[str]]:
+        """Relative paths of lockfiles and oh_modules directories in a project"""
+        lockfiles = []
+        modules = []
+        for dirpath, dirnames, filenames in os.walk(project_dir):
+            rel = os.path.relpath(dirpath, project_dir)
+            if MODULES_DIR in dirnames:
+                modules.append(os.path.normpath(os.path.join(rel, MODULES_DIR)))
+            dirnames[:] = sorted(d for d in dirnames if d not in _SKIP_DIRS)
+            if LOCKFILE_NAME in filenames:
+                lockfiles.append(os.path.normpath(os.path.join(rel, LOCKFILE_NAME)))
+        return sorted(lockfiles), sorted(modules)
+
+    def key(self, project_dir: str, args: List[str]) -> Optional[str]:
+        """Cache key of a project, or None if it has no lockfile"""
+        lockfiles, _ = self._scan(project_dir)
+        if not lockfiles:
+            return None
+
+        digest = hashlib.sha256()
+        digest.update(f"ohpm {self.version}\0{' '.join(args)}\0".encode("utf-8"))
+        for rel in lockfiles:
+            digest.update(rel.replace(os.sep, "/").encode("utf-8") + b"\0")
+            with open(os.path.join(project_dir, rel), "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        return digest.hexdigest()
+
+    def run_install(self, project_dir: str, args: List[str],
+                    install: Callable[[], Tuple[bool, str, int, float]]
+                    ) -> Tuple[bool, str, int, float]:
+        """
+        Restore ``oh_modules`` from the cache, or run ``install`` and fill the cache.
+
+        Args:
+            args: Install arguments (part of the key)
+            install: Runs the real ``ohpm install`` and returns its result tuple
+
+        Returns:
+            Tuple[bool, str, int, float]: Same shape as Executor.execute_command
+        """
+        start_time = time.time()
+        self._served.discard(os.path.abspath(project_dir))
+        try:
+            key = self.key(project_dir, args)
+        except OSError as e:
+            self.logger.warning(f"ohpm cache bypassed, cannot hash lockfile: {e}")
+            return install()
+        if key is None:
+            # Nothing to look up yet, but the install may create the lockfile
+            self.logger.info(f"ohpm cache lookup skipped, no {LOCKFILE_NAME} in {project_dir}")
+            result = install()
+            if result[0]:
+                self._fill(project_dir, args)
+            return result
+
+        with self._locked(key, exclusive=False):
+            restored = self._restore(key, project_dir)
+        if restored is None:
+            # Single flight: a concurrent case with the same key waits and then restores
+            with self._locked(key, exclusive=True):
+                restored = self._restore(key, project_dir, exclusive=True)
+                if restored is None:
+                    self.logger.info(f"ohpm cache miss (key {key[:12]}), running install")
+                    result = install()
+                    if result[0]:
+                        self._fill(project_dir, args)
+                    return result
+
+        modules, mode = restored
+        duration = time.time() - start_time
+        message = (
+            f"Restored {len(modules)} {MODULES_DIR} director(ies) from ohpm cache "
+            f"(key {key[:12]}, {mode})"
+        )
+        self.logger.info(f"{message} (duration: {duration:.2f}s)")
+        self._served.add(os.path.abspath(project_dir))
+        return True, message + "\n", 0, duration
+
+    def served_from_cache(self, project_dir: str) -> bool:
+        """Whether the last install in ``project_dir`` was restored from the cache instead of run"""
+        return os.path.abspath(project_dir) in self._served
+
+    def _restore(self, key: str, project_dir: str,
+                 exclusive: bool = False) -> Optional[Tuple[List[str], str]]:
+        """
+        Args:
+            exclusive: The key's lock is held exclusively, so a damaged entry can be discarded
+        """
+        entry = self._entry_dir(key)
+        try:
+            with open(os.path.join(entry, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # Hardlinks would hand a modified entry on to every later restore
+        if self.link_mode == "hardlink" and not self._intact(entry, meta):
+            if exclusive:
+                self.logger.warning(
+                    f"ohpm cache entry {key[:12]} was modified after it was stored, discarding it"
+                )
+                self._discard(key)
+            return None
+
+        state = {"mode": self.link_mode}
+        for rel in meta["modules"]:
+            target = os.path.join(project_dir, rel)
+            staging = f"{target}.restore-{uuid.uuid4().hex[:8]}"
+            try:
+                shutil.copytree(
+                    os.path.join(entry, "modules", rel), staging,
+                    symlinks=True, copy_function=lambda src, dst: self._clone(src, dst, state)
+                )
+                self._remove_tree(target)
+                os.rename(staging, target)
+            except OSError as e:
+                self.logger.warning(f"Failed to restore {rel} from ohpm cache: {e}")
+                self._remove_tree(staging)
+                return None
+
+        os.utime(os.path.join(entry, ".last_used"))
+        return meta["modules"], state["mode"]
+
+    @staticmethod
+    def _manifest(modules_dir: str) -> dict:
+        """Size and mtime of every regular file below ``modules_dir``, by relative path"""
+        files = {}
+        for dirpath, _, filenames in os.walk(modules_dir):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                st = os.lstat(path)
+                if stat.S_ISREG(st.st_mode):
+                    rel = os.path.relpath(path, modules_dir).replace(os.sep, "/")
+                    files[rel] = [st.st_size, st.st_mtime_ns]
+        return files
+
+    def _intact(self, entry: str, meta: dict) -> bool:
+        """Whether the entry's files still match the manifest recorded when it was stored"""
+        try:
+            return self._manifest(os.path.join(entry, "modules")) == meta.get("files")
+        except OSError:
+            return False
+
+    def _fill(self, project_dir: str, args: List[str]):
+        # Installing may create or rewrite the lockfile, so key what is on disk now
+        try:
+            key = self.key(project_dir, args)
+            if key is None or os.path.isdir(self._entry_dir(key)):
+                return
+            _, modules = self._scan(project_dir)
+
+            staging = os.path.join(self.cache_dir, "tmp", f"{key}.{uuid.uuid4().hex[:8]}")
+            # Never hardlink into the store: a build touching the project copy would corrupt it
+            state = {"mode": "copy" if self.link_mode in ("hardlink", "copy") else "reflink"}
+            for rel in modules:
+                shutil.copytree(
+                    os.path.join(project_dir, rel), os.path.join(staging, "modules", rel),
+                    symlinks=True, copy_function=lambda src, dst: self._clone(src, dst, state)
+                )
+            os.makedirs(staging, exist_ok=True)
+            files = self._manifest(os.path.join(staging, "modules"))
+            size = sum(file_size for file_size, _ in files.values())
+            with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({
+                    "key": key,
+                    "ohpm_version": self.version,
+                    "args": args,
+                    "modules": modules,
+                    "size": size,
+                    "files": files,
+                    "created": time.time(),
+                }, f, indent=2)
+            open(os.path.join(staging, ".last_used"), "w").close()
+
+            try:
+                os.rename(staging, self._entry_dir(key))
+            except OSError as e:
+                if e.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+                    raise
+                # Another writer published the same key first
+                self._remove_tree(staging)
+                return
+            self.logger.info(
+                f"Stored {len(modules)} {MODULES_DIR} director(ies) in ohpm cache "
+                f"(key {key[:12]}, {size / (1024 * 1024):.1f} MB)"
+            )
+        except OSError as e:
+            self.logger.warning(f"Failed to store ohpm cache entry: {e}")
+            return
+
+        self.evict(keep=key)
+
+    def evict(self, keep: Optional[str] = None):
+        """Delete least recently used entries until the cache fits in max_size"""
+        with self._locked("evict", exclusive=True, blocking=False) as acquired:
+            if not acquired:
+                return
+            entries = []
+            entries_dir = os.path.join(self.cache_dir, "entries")
+            for key in os.listdir(entries_dir):
+                entry = os.path.join(entries_dir, key)
+                try:
+                    with open(os.path.join(entry, "meta.json"), "r", encoding="utf-8") as f:
+                        size = json.load(f).get("size", 0)
+                    last_used = os.path.getmtime(os.path.join(entry, ".last_used"))
+                except (OSError, ValueError):
+                    continue
+                entries.append((last_used, key, size))
+
+            total = sum(size for _, _, size in entries)
+            for _, key, size in sorted(entries):
+                if total <= self.max_size:
+                    break
+                if key == keep:
+                    continue
+                with self._locked(key, exclusive=True, blocking=False) as acquired:
+                    if not acquired or not self._discard(key):
+                        continue
+                total -= size
+                self.logger.info(f"Evicted ohpm cache entry {key[:12]} ({size / (1024 * 1024):.1f} MB)")
+
+    def _discard(self, key: str) -> bool:
+        """Delete an entry; the caller holds the key's lock exclusively"""
+        trash = os.path.join(self.cache_dir, "tmp", f"evict-{key}.{uuid.uuid4().hex[:8]}")
+        try:
+            os.rename(self._entry_dir(key), trash)
+        except OSError:
+            return False
+        self._remove_tree(trash)
+        return True
+
+    @staticmethod
+    def _remove_tree(path: str):
+        if os.path.islink(path) or os.path.isfile(path):
+            os.unlink(path)
+        elif os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def _reflink(src: str, dst: str) -> bool:
+        if fcntl is None:
+            return False
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            except OSError:
+                ok = False
+            else:
+                ok = True
+        if ok:
+            shutil.copystat(src, dst)
+        else:
+            os.unlink(dst)
+        return ok
+
+    def _clone(self, src: str, dst: str, state: dict):
+        """
+        Copy one file using the cheapest method available.
+
+        ``state['mode']`` starts at the configured mode and is downgraded to
+        copy the first time a method fails, so an unsupported file system
+        costs one failed attempt per tree. ``auto`` never hardlinks.
+
+        A hardlinked file shares its inode with the store, so the store file
+        is made read-only first: a build writing it then fails instead of
+        silently changing the cache entry. Copies get their owner write
+        permission back.
+        """
+        if state["mode"] in ("auto", "reflink"):
+            if self._reflink(src, dst):
+                state["mode"] = "reflink"
+                self._make_writable(dst)
+                return dst
+            state["mode"] = "copy"
+        if state["mode"] == "hardlink":
+            try:
+                mode = os.stat(src).st_mode
+                if mode & 0o222:
+                    os.chmod(src, mode & ~0o222)
+                os.link(src, dst)
+                return dst
+            except OSError:
+                state["mode"] = "copy"
+        shutil.copy2(src, dst)
+        self._make_writable(dst)
+        return dst
+
+    @staticmethod
+    def _make_writable(path: str):
+        mode = os.stat(path).st_mode
+        if not mode & stat.S_IWUSR:
+            os.chmod(path, mode | stat.S_IWUSR)
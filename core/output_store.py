@@ -0,0 +1,193 @@
+"""Compressed command output store"""
+
+import json
+import lzma
+import os
+import shutil
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, open files cannot be deleted anyway
+    fcntl = None
+
+
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (lambda data: lzma.compress(data, preset=6), lzma.decompress),
+}
+
+DATA_FILE = "outputs.dat"
+INDEX_FILE = "index.jsonl"
+# flock held by the writing process for as long as the run is open
+LOCK_FILE = "writer.lock"
+
+
+class OutputStore:
+    """
+    Append-only store of the full output of every command in a run.
+
+    Each output is compressed on its own and appended to ``outputs.dat``;
+    ``index.jsonl`` maps test case and command index to the byte range, so
+    one output can be read back without decompressing anything else. Every
+    run gets its own directory below ``root``, which makes retention a
+    matter of deleting whole runs.
+    """
+
+    def __init__(self, root: str, run_id: str, compression: str = "zlib"):
+        self.root = root
+        self.run_id = run_id
+        self.compression = compression
+        self._compress = CODECS[compression][0]
+        self._lock = threading.Lock()
+        self.run_dir = os.path.join(root, run_id)
+        os.makedirs(self.run_dir, exist_ok=True)
+        self._writer = open(os.path.join(self.run_dir, LOCK_FILE), "a")
+        if fcntl is not None:
+            fcntl.flock(self._writer, fcntl.LOCK_EX)
+        self._data = open(os.path.join(self.run_dir, DATA_FILE), "ab")
+        self._index = open(os.path.join(self.run_dir, INDEX_FILE), "a", encoding="utf-8")
+
+    def put(self, testcase: str, kind: str, index: int, command: list,
+            output: str, exit_code: int):
+        """
+        Args:
+            kind: "command" or "artifact"
+            index: 1-based position of the command within its kind
+        """
+        raw = output.encode("utf-8", errors="replace")
+        chunk = self._compress(raw)
+        with self._lock:
+            if self._data.closed:
+                return
+            offset = self._data.tell()
+            self._data.write(chunk)
+            self._data.flush()
+            self._index.write(json.dumps({
+                "testcase": testcase,
+                "kind": kind,
+                "index": index,
+                "command": command,
+                "exit_code": exit_code,
+                "codec": self.compression,
+                "offset": offset,
+                "length": len(chunk),
+                "size": len(raw),
+                "time": time.time(),
+            }) + "\n")
+            self._index.flush()
+
+    def close(self):
+        with self._lock:
+            self._data.close()
+            self._index.close()
+            self._writer.close()
+
+    @staticmethod
+    def runs(root: str) -> List[str]:
+        """Run ids in the store, oldest first"""
+        if not os.path.isdir(root):
+            return []
+        return sorted(
+            name for name in os.listdir(root)
+            if os.path.isfile(os.path.join(root, name, INDEX_FILE))
+        )
+
+    @staticmethod
+    def entries(root: str, run_id: str) -> List[Dict[str, Any]]:
+        entries = []
+        with open(os.path.join(root, run_id, INDEX_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+        return entries
+
+    @classmethod
+    def find(cls, root: str, testcase: str, run_id: Optional[str] = None
+             ) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """
+        Index entries of the latest attempt of a test case.
+
+        Returns:
+            Tuple[Optional[str], List[Dict[str, Any]]]: (run id, entries), searching
+                the newest run first unless ``run_id`` is given
+        """
+        run_ids = [run_id] if run_id else list(reversed(cls.runs(root)))
+        for rid in run_ids:
+            matching = [e for e in cls.entries(root, rid) if e["testcase"] == testcase]
+            if not matching:
+                continue
+            # A test case rerun in watch mode starts again at command 1
+            starts = [
+                i for i, e in enumerate(matching) if e["kind"] == "command" and e["index"] == 1
+            ]
+            return rid, matching[starts[-1]:] if starts else matching
+        return None, []
+
+    @staticmethod
+    def read(root: str, run_id: str, entry: Dict[str, Any]) -> str:
+        """Decompress a single output"""
+        with open(os.path.join(root, run_id, DATA_FILE), "rb") as f:
+            f.seek(entry["offset"])
+            chunk = f.read(entry["length"])
+        return CODECS[entry["codec"]][1](chunk).decode("utf-8", errors="replace")
+
+    @staticmethod
+    @contextmanager
+    def _unused(run_dir: str):
+        """Yield True while holding the run's writer lock, False if a process still writes the run"""
+        if fcntl is None:
+            yield True
+            return
+        with open(os.path.join(run_dir, LOCK_FILE), "a") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            yield True
+
+    @classmethod
+    def prune(cls, root: str, retention_days: int, max_size_mb: int,
+              keep: Optional[str] = None) -> List[str]:
+        """
+        Delete runs older than ``retention_days`` (0 = no age limit), then the
+        oldest runs until the store fits in ``max_size_mb`` (0 = no size limit).
+        Runs still open in another process are never deleted.
+
+        Returns:
+            List[str]: Deleted run ids
+        """
+        sizes = {}
+        for run_id in cls.runs(root):
+            run_dir = os.path.join(root, run_id)
+            sizes[run_id] = sum(
+                os.path.getsize(os.path.join(run_dir, name)) for name in os.listdir(run_dir)
+            )
+
+        deleted = []
+        now = time.time()
+        total = sum(sizes.values())
+        for run_id in sorted(sizes):
+            if run_id == keep:
+                continue
+            run_dir = os.path.join(root, run_id)
+            too_old = retention_days and now - os.path.getmtime(
+                os.path.join(run_dir, INDEX_FILE)
+            ) > retention_days * 86400
+            too_big = max_size_mb and total > max_size_mb * 1024 * 1024
+            if not too_old and not too_big:
+                continue
+            with cls._unused(run_dir) as unused:
+                if not unused:
+                    continue
+                shutil.rmtree(run_dir, ignore_errors=True)
+            total -= sizes[run_id]
+            deleted.append(run_id)
+        return deleted
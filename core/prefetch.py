@@ -0,0 +1,102 @@
+"""Dependency prefetch stage"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+
+INSTALL_SUBCOMMANDS = ("install", "i")
+
+
+def is_install_command(command: list) -> bool:
+    return len(command) >= 2 and command[0] == "ohpm" and command[1] in INSTALL_SUBCOMMANDS
+
+
+def split_prepare_commands(config) -> Tuple[List[List[str]], List[List[str]]]:
+    """
+    Split a test case into prepare commands and build commands.
+
+    Prepare commands are the explicit ``prepare`` list followed by the
+    ``ohpm install`` commands leading ``commands``. Leading installs stay
+    regular commands if moving them would change what checks them: output
+    validation, command hooks, or the ``pre_testcase`` hook they follow.
+    """
+    commands = list(config.commands)
+    prepare = list(config.prepare)
+    hooks = config.hooks or {}
+    if config.validation or any(h in hooks for h in ("pre_testcase", "pre_command", "post_command")):
+        return prepare, commands
+    while commands and is_install_command(commands[0]):
+        prepare.append(commands.pop(0))
+    return prepare, commands
+
+
+class PrefetchStage:
+    """
+    Runs the prepare commands of upcoming test cases ahead of time.
+
+    Installing dependencies is network and disk bound while builds are CPU
+    bound, so while one test case builds, the prepare commands of the next
+    ``lookahead`` test cases run on a separate worker pool. A test case is
+    only prefetched once all its dependencies have passed, and never while
+    an earlier unfinished test case (or a pending artifact action) uses the
+    same path, since both would write into the same project. Test cases
+    with a ``pre_testcase`` hook are not prefetched, their prepare commands
+    always run after the hook.
+    """
+
+    def __init__(self, executor, max_workers: int = 4, lookahead: int = 4):
+        self.executor = executor
+        self.lookahead = lookahead
+        self.logger = get_logger()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._futures: Dict[str, object] = {}
+
+    def schedule(self, testcases: list, position: int, completed: dict, busy_paths=()):
+        """
+        Start prefetching eligible test cases among the ``lookahead`` after ``position``.
+
+        Args:
+            testcases: Test cases of the run in execution order
+            position: Index of the test case about to execute
+            completed: Results of finished test cases, by name
+            busy_paths: Paths still in use by background work
+        """
+        if self.executor.cancelled:
+            return
+
+        unfinished_paths = {os.path.normcase(os.path.abspath(p)) for p in busy_paths}
+        for testcase in testcases[position:position + self.lookahead + 1]:
+            path = os.path.normcase(os.path.abspath(testcase.path))
+            blocked = path in unfinished_paths
+            if testcase.name not in completed:
+                unfinished_paths.add(path)
+
+            if testcase is testcases[position] or testcase.name in self._futures:
+                continue
+            if not testcase.prepare_commands or blocked or "pre_testcase" in testcase.hooks:
+                continue
+            if not all(completed.get(dep) for dep in testcase.dependencies):
+                continue
+
+            self.logger.info(f"Prefetching dependencies of: {testcase.name}")
+            self._futures[testcase.name] = self._pool.submit(self.executor.run_prepare, testcase)
+
+    def take(self, testcase) -> Optional[tuple]:
+        """Wait for and return the prefetched prepare result, or None if not prefetched"""
+        future = self._futures.pop(testcase.name, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            return False, [], f"Prepare exception: {e}"
+
+    def shutdown(self):
+        # Results of test cases that never ran (cancelled runs) are discarded
+        for future in self._futures.values():
+            future.cancel()
+        self._futures = {}
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,214 @@
+"""Process tree management module"""
+
+import os
+import platform
+import signal
+import subprocess
+import threading
+import time
+from typing import Callable, Iterable, List, Optional, Tuple
+
+IS_WINDOWS = platform.system() == "Windows"
+
+
+def new_group_kwargs() -> dict:
+    """Popen arguments that start the command as leader of its own process group"""
+    if IS_WINDOWS:
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def _signal_group(pgid: int, sig) -> bool:
+    try:
+        os.killpg(pgid, sig)
+        return True
+    except (ProcessLookupError, PermissionError):
+        return False
+
+
+def _signal_pids(pids: Iterable[int], sig):
+    for pid in pids:
+        try:
+            os.kill(pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+def terminate_tree(process: subprocess.Popen, grace_period: float):
+    """
+    Stop a command and everything it spawned.
+
+    A graceful signal is sent to the whole process group first (SIGTERM, or
+    CTRL_BREAK_EVENT on Windows); whatever is still alive after
+    ``grace_period`` seconds is force-killed.
+    """
+    if IS_WINDOWS:
+        if process.poll() is None:
+            try:
+                process.send_signal(signal.CTRL_BREAK_EVENT)
+                process.wait(grace_period)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        subprocess.run(
+            ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        return
+
+    # The leader may already be gone while descendants still hold the group
+    _signal_group(process.pid, signal.SIGTERM)
+    deadline = time.time() + grace_period
+    while time.time() < deadline:
+        if process.poll() is not None and not list_group_members([process.pid]):
+            break
+        time.sleep(0.1)
+
+    _signal_group(process.pid, signal.SIGKILL)
+    # Members that moved to another group but stayed in the session
+    _signal_pids(list_group_members([process.pid]), signal.SIGKILL)
+    process.wait()
+
+
+def list_group_members(pgids: Iterable[int]) -> List[int]:
+    """Return pids of live processes whose process group or session is one of ``pgids``"""
+    pgids = set(pgids)
+    if not pgids or IS_WINDOWS:
+        return []
+
+    members = []
+    if os.path.isdir("/proc"):
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", "r") as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            # Fields after "(comm)": state ppid pgrp session ...
+            fields = stat.rsplit(")", 1)[-1].split()
+            if fields[0] == "Z":
+                continue
+            if int(fields[2]) in pgids or int(fields[3]) in pgids:
+                members.append(int(entry))
+        return members
+
+    try:
+        output = subprocess.run(
+            ["ps", "-A", "-o", "pid=,pgid=,stat="],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).stdout
+    except OSError:
+        return []
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) >= 3 and int(parts[1]) in pgids and not parts[2].startswith("Z"):
+            members.append(int(parts[0]))
+    return members
+
+
+def reap_groups(pgids: Iterable[int], grace_period: float) -> List[int]:
+    """
+    Terminate processes left behind in the given process groups.
+
+    Returns:
+        List[int]: pids that were still alive and have been signalled
+    """
+    pgids = list(pgids)
+    leaked = list_group_members(pgids)
+    if not leaked:
+        return []
+
+    for pgid in pgids:
+        _signal_group(pgid, signal.SIGTERM)
+    _signal_pids(leaked, signal.SIGTERM)
+
+    deadline = time.time() + grace_period
+    while time.time() < deadline and list_group_members(pgids):
+        time.sleep(0.1)
+
+    for pgid in pgids:
+        _signal_group(pgid, signal.SIGKILL)
+    _signal_pids(list_group_members(pgids), signal.SIGKILL)
+    return leaked
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def sample_group_usage(pgids: Iterable[int]) -> Tuple[int, float, int]:
+    """
+    Resident memory and CPU time of the processes in the given groups (Linux only).
+
+    Returns:
+        Tuple[int, float, int]: (rss_bytes, cpu_seconds, process_count)
+    """
+    pgids = set(pgids)
+    rss = 0
+    cpu_ticks = 0
+    count = 0
+    if not pgids or not os.path.isdir("/proc"):
+        return rss, 0.0, count
+
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        fields = stat.rsplit(")", 1)[-1].split()
+        if fields[0] == "Z" or (int(fields[2]) not in pgids and int(fields[3]) not in pgids):
+            continue
+        # utime, stime and rss are fields 14, 15 and 24 of /proc/<pid>/stat
+        cpu_ticks += int(fields[11]) + int(fields[12])
+        rss += int(fields[21]) * _PAGE_SIZE
+        count += 1
+    return rss, cpu_ticks / _CLOCK_TICKS, count
+
+
+class ResourceSampler:
+    """
+    Periodically samples the memory and CPU usage of a process group on a
+    background thread, keeping the peak RSS and handing each sample to
+    ``on_sample(rss_bytes, cpu_seconds, process_count)``.
+    """
+
+    def __init__(self, pgid: int, interval: float = 0.5,
+                 on_sample: Optional[Callable[[int, float, int], None]] = None):
+        self.pgid = pgid
+        self.interval = interval
+        self.on_sample = on_sample
+        self.peak_rss = 0
+        self.cpu_seconds = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+
+    def start(self) -> "ResourceSampler":
+        if not IS_WINDOWS:
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            rss, cpu, count = sample_group_usage([self.pgid])
+            if count:
+                self.peak_rss = max(self.peak_rss, rss)
+                self.cpu_seconds = max(self.cpu_seconds, cpu)
+                if self.on_sample:
+                    self.on_sample(rss, cpu, count)
+            if self._stop.wait(self.interval):
+                break
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
@@ -0,0 +1,297 @@
+"""Long-lived framework server on a Unix domain socket"""
+
+import json
+import logging
+import os
+import select
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config.loader import ConfigLoader
+from config.models import Config
+from config.tag_query import TagIndex
+from core.framework import TestFramework
+from core.testcase import TestCase
+from utils.logger import ColoredFormatter, get_logger
+
+
+CONFIG_FILES = ("config.yaml", "testcases.yaml")
+
+
+def send_message(conn: socket.socket, message: Dict[str, Any]):
+    conn.sendall((json.dumps(message) + "\n").encode("utf-8"))
+
+
+class ClientLogHandler(logging.Handler):
+    """Streams log records of a run to the requesting client"""
+
+    def __init__(self, conn: socket.socket, on_disconnect):
+        super().__init__()
+        self.conn = conn
+        self.on_disconnect = on_disconnect
+        self.connected = True
+        self.setFormatter(ColoredFormatter(
+            '[%(asctime)s] [%(levelname)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+
+    def emit(self, record):
+        if not self.connected:
+            return
+        try:
+            send_message(self.conn, {"type": "log", "line": self.format(record)})
+        except OSError:
+            self.disconnected()
+
+    def disconnected(self):
+        if self.connected:
+            self.connected = False
+            self.on_disconnect()
+
+
+class FrameworkServer:
+    """
+    Serves run requests without paying the startup cost of each invocation.
+
+    The parsed and validated configuration, its test cases sorted by
+    dependencies and their tag index stay in memory and are rebuilt when
+    ``config.yaml`` or ``testcases.yaml`` change. Requests are newline-delimited JSON; a run request streams
+    the log lines of the run back and ends with a result message. Runs
+    execute one at a time, further clients wait until the current run is
+    finished. A client that disconnects cancels its run.
+    """
+
+    def __init__(self, config_dir: str, socket_path: str):
+        self.config_dir = config_dir
+        self.socket_path = socket_path
+        self.logger = get_logger()
+        self.config: Optional[Config] = None
+        self.config_error = ""
+        self.testcases: Optional[List[TestCase]] = None
+        self._mtimes = None
+        self._sock: Optional[socket.socket] = None
+        self._stopping = False
+
+    def _current_mtimes(self) -> tuple:
+        mtimes = []
+        for name in CONFIG_FILES:
+            try:
+                mtimes.append(os.stat(os.path.join(self.config_dir, name)).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _refresh_config(self) -> bool:
+        """Reload the configuration if its files changed since the last load"""
+        mtimes = self._current_mtimes()
+        if mtimes == self._mtimes:
+            return self.config is not None
+
+        start = time.time()
+        self._mtimes = mtimes
+        try:
+            self.config = ConfigLoader(self.config_dir).load_all()
+            self.config_error = ""
+            self.testcases = self._sorted_testcases(self.config)
+            print(f"[\u221a] Configuration loaded: {len(self.config.testcases)} test cases "
+                  f"({(time.time() - start) * 1000:.0f} ms)")
+        except Exception as e:
+            self.config = None
+            self.testcases = None
+            self.config_error = f"Failed to load configuration: {e}"
+            print(f"[\u00d7] {self.config_error}")
+        return self.config is not None
+
+    def _sorted_testcases(self, config: Config) -> Optional[List[TestCase]]:
+        """
+        Test cases sorted by dependencies, with the tag index rebuilt in that order.
+
+        Returns:
+            Optional[List[TestCase]]: None if the dependencies are invalid; every
+                run then reports the error itself
+        """
+        framework = TestFramework(self.config_dir, config=config)
+        framework.testcases = [TestCase(tc_config) for tc_config in config.testcases]
+        try:
+            framework._validate_dependencies()
+            testcases = framework._sort_by_dependencies()
+        except ValueError:
+            return None
+        config.tag_index = TagIndex(testcases)
+        return testcases
+
+    def serve(self):
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("server mode requires Unix domain sockets")
+
+        self._bind()
+        self._refresh_config()
+        print(f"Server listening on {self.socket_path}")
+        try:
+            while not self._stopping:
+                conn, _ = self._sock.accept()
+                with conn:
+                    self._handle(conn)
+        except KeyboardInterrupt:
+            print("Server stopped")
+        finally:
+            self._sock.close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def _bind(self):
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+                raise OSError(f"another server is already listening on {self.socket_path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Left behind by a server that did not shut down cleanly
+                os.unlink(self.socket_path)
+            finally:
+                probe.close()
+
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.socket_path)
+        # Requests run the configured commands, so only the owner may connect
+        os.chmod(self.socket_path, 0o600)
+        self._sock.listen(16)
+
+    def _handle(self, conn: socket.socket):
+        try:
+            request = json.loads(conn.makefile("r", encoding="utf-8").readline() or "null")
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            self._reply(conn, {"type": "error", "message": f"Invalid request: {e}"})
+            return
+
+        action = request.get("action")
+        if action == "ping":
+            loaded = self._refresh_config()
+            self._reply(conn, {
+                "type": "status",
+                "config_dir": os.path.abspath(self.config_dir),
+                "testcases": len(self.config.testcases) if loaded else 0,
+                "error": self.config_error,
+            })
+        elif action == "shutdown":
+            self._stopping = True
+            self._reply(conn, {"type": "status", "message": "shutting down"})
+        elif action == "run":
+            self._run(conn, request)
+        else:
+            self._reply(conn, {"type": "error", "message": f"Unknown action: {action}"})
+
+    def _reply(self, conn: socket.socket, message: Dict[str, Any]):
+        try:
+            send_message(conn, message)
+        except OSError:
+            pass
+
+    def _run(self, conn: socket.socket, request: Dict[str, Any]):
+        if not self._refresh_config():
+            self._reply(conn, {"type": "error", "message": self.config_error})
+            return
+
+        try:
+            options = self._run_options(request)
+        except ValueError as e:
+            self._reply(conn, {"type": "error", "message": f"Invalid request: {e}"})
+            return
+
+        framework = None
+
+        def cancel_run():
+            if framework is not None:
+                framework.cancel("client disconnected")
+
+        handler = ClientLogHandler(conn, cancel_run)
+        framework = TestFramework(
+            self.config_dir,
+            config=self.config,
+            log_handler=handler,
+            testcases=self.testcases,
+            **options
+        )
+
+        finished = threading.Event()
+        monitor = threading.Thread(
+            target=self._watch_disconnect, args=(conn, handler, finished),
+            name="client-monitor", daemon=True
+        )
+        monitor.start()
+        try:
+            if not framework.initialize():
+                self._reply(conn, {"type": "error", "message": "Framework initialization failed"})
+                return
+            framework.run()
+        finally:
+            finished.set()
+            monitor.join()
+            if framework.logger:
+                framework.logger.removeHandler(handler)
+            if framework.journal:
+                framework.journal.close()
+            if framework.executor and framework.executor.output_store:
+                framework.executor.output_store.close()
+            if framework.executor and framework.executor.duration_history:
+                framework.executor.duration_history.close()
+
+        statuses = {tc.name: tc.status for tc in framework.testcases}
+        failed = sum(1 for status in statuses.values() if status == TestCase.STATUS_FAILED)
+        self._reply(conn, {
+            "type": "result",
+            "exit_code": 1 if failed or framework.cancelled else 0,
+            "statuses": statuses,
+        })
+
+    @staticmethod
+    def _run_options(request: Dict[str, Any]) -> Dict[str, Any]:
+        """TestFramework arguments of a run request"""
+        tags = request.get("tags")
+        if tags is not None and not isinstance(tags, str):
+            raise ValueError("tags must be a string")
+
+        shard = request.get("shard")
+        if shard is not None:
+            if not (isinstance(shard, list) and len(shard) == 2
+                    and all(isinstance(v, int) for v in shard) and 1 <= shard[0] <= shard[1]):
+                raise ValueError("shard must be [index, count] with 1 <= index <= count")
+            shard = tuple(shard)
+
+        jobs = request.get("jobs")
+        if jobs is not None and (not isinstance(jobs, int) or jobs <= 0):
+            raise ValueError("jobs must be a positive integer")
+
+        max_failures = request.get("max_failures", 0)
+        if not isinstance(max_failures, int) or max_failures < 0:
+            raise ValueError("max_failures must be a non-negative integer")
+
+        return {
+            "tags": tags,
+            "max_failures": max_failures,
+            "changed_since": request.get("changed_since"),
+            "repo_dir": request.get("repo") or ".",
+            "shard": shard,
+            "jobs": jobs,
+        }
+
+    @staticmethod
+    def _watch_disconnect(conn: socket.socket, handler: ClientLogHandler, finished: threading.Event):
+        """Clients send nothing after the request, so a readable socket means it was closed"""
+        while not finished.is_set() and handler.connected:
+            readable, _, _ = select.select([conn], [], [], 0.5)
+            if readable:
+                try:
+                    closed = not conn.recv(1, socket.MSG_PEEK)
+                except OSError:
+                    closed = True
+                if closed:
+                    handler.disconnected()
+                    return
+                # Ignore unexpected data and keep watching
+                conn.recv(4096)
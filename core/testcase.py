@@ -2,6 +2,8 @@
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from config.models import TestCaseConfig
+from core.validation import OutputValidator
+from core.prefetch import split_prepare_commands
 
 
 class TestCase:
@@ -11,16 +13,22 @@ class TestCase:
     STATUS_PASSED = 'PASSED'        # Passed
     STATUS_FAILED = 'FAILED'        # Failed
     STATUS_SKIPPED = 'SKIPPED'      # Skipped
+    STATUS_CANCELLED = 'CANCELLED'  # Interrupted while running
     
     def __init__(self, config: TestCaseConfig):
 
         self.config = config
         self.name = config.name
         self.path = config.path
-        self.commands = config.commands
+        # Dependency installation runs separately from the build commands (see PrefetchStage)
+        self.prepare_commands, self.commands = split_prepare_commands(config)
         self.tags = config.tags
         self.dependencies = config.dependencies
         self.timeout = config.timeout
+        self.artifacts = config.artifacts
+        self.hooks = config.hooks or {}
+        self.validator = OutputValidator(config.validation) if config.validation else None
+        self.benchmark = config.benchmark if config.type == "incremental_benchmark" else None
         
         self.status = self.STATUS_PENDING
         self.start_time: Optional[datetime] = None
@@ -29,6 +37,44 @@ class TestCase:
         self.output: str = ""
         self.error_message: str = ""
         self.executed_commands: List[Dict[str, Any]] = []
+        self.artifact_results: List[Dict[str, Any]] = []
+        self.validation_results: Optional[Dict[str, Any]] = None
+        self.benchmark_results: Optional[Dict[str, Any]] = None
+    
+    def reset(self):
+        """Clear results so the test case can be executed again"""
+        self.status = self.STATUS_PENDING
+        self.start_time = None
+        self.end_time = None
+        self.duration = 0.0
+        self.output = ""
+        self.error_message = ""
+        self.executed_commands = []
+        self.artifact_results = []
+        self.validation_results = None
+        self.benchmark_results = None
+    
+    def restore(self, state: Dict[str, Any]):
+        """Take over the final state of a previous run recorded in a run journal"""
+        self.reset()
+        self.status = state['status']
+        self.error_message = state.get('error_message') or ""
+        self.duration = state.get('duration') or 0.0
+        if state.get('start_time'):
+            self.start_time = datetime.fromisoformat(state['start_time'])
+        if state.get('end_time'):
+            self.end_time = datetime.fromisoformat(state['end_time'])
+        self.executed_commands = [
+            {
+                'command': c['command'],
+                'success': c['success'],
+                'output': "",
+                'exit_code': c['exit_code'],
+                'duration': c['duration']
+            }
+            for c in state.get('commands', [])
+        ]
+        self.artifact_results = [dict(r, output="") for r in state.get('artifact_results', [])]
     
     def start(self):
         self.status = self.STATUS_RUNNING
@@ -45,6 +91,18 @@ class TestCase:
             self.status = self.STATUS_FAILED
             self.error_message = error_message
     
+    def fail(self, error_message: str):
+        """Mark an already finished test case as failed"""
+        self.status = self.STATUS_FAILED
+        self.error_message = error_message
+    
+    def cancel(self, reason: str = ""):
+        self.end_time = datetime.now()
+        if self.start_time:
+            self.duration = (self.end_time - self.start_time).total_seconds()
+        self.status = self.STATUS_CANCELLED
+        self.error_message = reason
+    
     def skip(self, reason: str = ""):
         self.status = self.STATUS_SKIPPED
         self.error_message = reason
@@ -66,14 +124,41 @@ class TestCase:
             self.output += f"{'='*60}\n"
             self.output += output
     
+    def add_artifact_result(self, command: list, success: bool,
+                            output: str, exit_code: int, duration: float):
+
+        self.artifact_results.append({
+            'command': command,
+            'success': success,
+            'output': output,
+            'exit_code': exit_code,
+            'duration': duration
+        })
+    
+    def set_validation_results(self, errors: List[str], matches: List[Dict[str, Any]],
+                               diagnostic_counts: Dict[str, int]):
+
+        self.validation_results = {
+            'passed': not errors,
+            'errors': errors,
+            'diagnostic_counts': diagnostic_counts,
+            'matches': matches
+        }
+    
     def get_summary(self) -> Dict[str, Any]:
 
         return {
             'name': self.name,
             'status': self.status,
             'duration': self.duration,
-            'commands_count': len(self.commands),
+            'commands_count': len(self.prepare_commands) + len(self.commands),
             'executed_count': len(self.executed_commands),
+            'artifact_actions': [
+                {'command': r['command'], 'success': r['success'], 'exit_code': r['exit_code']}
+                for r in self.artifact_results
+            ],
+            'validation': self.validation_results,
+            'benchmark': self.benchmark_results,
             'error_message': self.error_message,
             'start_time': self.start_time.isoformat() if self.start_time else None,
             'end_time': self.end_time.isoformat() if self.end_time else None
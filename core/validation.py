@@ -0,0 +1,142 @@
+"""Command output validation module"""
+
+import re
+from typing import List, Dict, Any, Optional
+
+from config.models import ValidationConfig
+
+
+class OutputValidator:
+    """
+    Precompiled validation rules of one test case.
+
+    All patterns are additionally merged into a single alternation so that
+    lines matching no rule, which is almost every line of a build log, cost
+    one regex search. Patterns that cannot be merged (global inline flags,
+    backreferences) disable the prefilter.
+    """
+
+    KIND_REQUIRED = 'required'
+    KIND_FORBIDDEN = 'forbidden'
+    KIND_FAIL_FAST = 'fail_fast'
+    KIND_DIAGNOSTIC = 'diagnostic'
+
+    # Matched lines kept per rule; counts are always exact
+    MAX_RECORDED_MATCHES = 50
+
+    def __init__(self, config: ValidationConfig):
+        self.config = config
+        self.rules = []
+
+        for pattern in config.fail_fast_patterns:
+            self.rules.append((self.KIND_FAIL_FAST, pattern, re.compile(pattern)))
+        for pattern in config.forbidden_patterns:
+            self.rules.append((self.KIND_FORBIDDEN, pattern, re.compile(pattern)))
+        for pattern in config.required_patterns:
+            self.rules.append((self.KIND_REQUIRED, pattern, re.compile(pattern)))
+        for diag in config.diagnostics:
+            name = diag.get("name", diag["pattern"])
+            self.rules.append((self.KIND_DIAGNOSTIC, name, re.compile(diag["pattern"])))
+
+        self.any_rule = None
+        patterns = [rule[2].pattern for rule in self.rules]
+        if patterns and not any(re.search(r"\\\d|\(\?P=", p) for p in patterns):
+            try:
+                self.any_rule = re.compile("|".join(f"(?:{p})" for p in patterns))
+            except re.error:
+                self.any_rule = None
+
+    def start(self) -> "ValidationSession":
+        return ValidationSession(self)
+
+
+class ValidationSession:
+    """Streaming match state for one test case execution"""
+
+    def __init__(self, validator: OutputValidator):
+        self.validator = validator
+        self.counts: Dict[str, int] = {}
+        self.matches: List[Dict[str, Any]] = []
+        self.fatal_match: Optional[Dict[str, Any]] = None
+        self.command_index = 0
+        self.line_no = 0
+
+    def start_command(self, command_index: int):
+        self.command_index = command_index
+        self.line_no = 0
+
+    def feed(self, line: str) -> bool:
+        """
+        Match one output line against all rules.
+
+        Returns:
+            bool: True if a fail-fast pattern matched and the command should be killed
+        """
+        self.line_no += 1
+        validator = self.validator
+        if not validator.rules:
+            return False
+        if validator.any_rule is not None and not validator.any_rule.search(line):
+            return False
+
+        fatal = False
+        for kind, rule, regex in validator.rules:
+            if not regex.search(line):
+                continue
+
+            key = f"{kind}:{rule}"
+            count = self.counts.get(key, 0) + 1
+            self.counts[key] = count
+
+            if count <= OutputValidator.MAX_RECORDED_MATCHES:
+                match = {
+                    'kind': kind,
+                    'rule': rule,
+                    'command_index': self.command_index,
+                    'line_no': self.line_no,
+                    'line': line.rstrip('\r\n'),
+                }
+                self.matches.append(match)
+                if kind == OutputValidator.KIND_FAIL_FAST and self.fatal_match is None:
+                    self.fatal_match = match
+            fatal = fatal or kind == OutputValidator.KIND_FAIL_FAST
+
+        return fatal
+
+    def finish(self) -> List[str]:
+        """Evaluate whole-test-case rules and return the list of violations"""
+        errors = []
+        config = self.validator.config
+
+        if self.fatal_match:
+            errors.append(
+                f"fail-fast pattern '{self.fatal_match['rule']}' matched: {self.fatal_match['line']}"
+            )
+
+        for pattern in config.forbidden_patterns:
+            count = self.counts.get(f"{OutputValidator.KIND_FORBIDDEN}:{pattern}", 0)
+            if count:
+                errors.append(f"forbidden pattern '{pattern}' matched {count} time(s)")
+
+        for pattern in config.required_patterns:
+            if not self.counts.get(f"{OutputValidator.KIND_REQUIRED}:{pattern}"):
+                errors.append(f"required pattern '{pattern}' not found")
+
+        for diag in config.diagnostics:
+            name = diag.get("name", diag["pattern"])
+            count = self.counts.get(f"{OutputValidator.KIND_DIAGNOSTIC}:{name}", 0)
+            if "count" in diag and count != diag["count"]:
+                errors.append(f"diagnostic '{name}' count {count}, expected {diag['count']}")
+            if "min" in diag and count < diag["min"]:
+                errors.append(f"diagnostic '{name}' count {count}, expected at least {diag['min']}")
+            if "max" in diag and count > diag["max"]:
+                errors.append(f"diagnostic '{name}' count {count}, expected at most {diag['max']}")
+
+        return errors
+
+    def diagnostic_counts(self) -> Dict[str, int]:
+        counts = {}
+        for diag in self.validator.config.diagnostics:
+            name = diag.get("name", diag["pattern"])
+            counts[name] = self.counts.get(f"{OutputValidator.KIND_DIAGNOSTIC}:{name}", 0)
+        return counts
@@ -0,0 +1,197 @@
+"""File system watcher module (Linux inotify)"""
+
+import ctypes
+import ctypes.util
+import errno
+import fnmatch
+import os
+import select
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+from utils.logger import get_logger
+
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Events of a path may still be read this long after it was unignored
+IGNORE_GRACE_PERIOD = 2.0
+
+
+class InotifyWatcher:
+    """
+    Recursive directory watcher on a single inotify descriptor.
+
+    inotify watches are per directory, so every subdirectory of a watched
+    tree gets its own watch. Directories whose name matches one of
+    ``exclude`` (build outputs, installed modules) are never entered, and
+    events for files matching it are dropped, as are events for paths the
+    framework itself is editing (see ``ignore``).
+    """
+
+    def __init__(self, exclude: Optional[List[str]] = None):
+        self.logger = get_logger()
+        self.exclude = exclude or []
+        self._wd_paths: Dict[int, str] = {}
+        self._roots: List[str] = []
+        self._ignored: Dict[str, Optional[float]] = {}
+        self._ignored_lock = threading.Lock()
+
+        libc_name = ctypes.util.find_library("c")
+        if not hasattr(os, "uname") or os.uname().sysname != "Linux" or not libc_name:
+            raise OSError("File watching requires Linux inotify")
+
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _is_excluded(self, name: str) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.exclude)
+
+    def ignore(self, paths: List[str]):
+        """Drop events for ``paths`` until they are unignored; safe to call from any thread"""
+        with self._ignored_lock:
+            for path in paths:
+                self._ignored[os.path.abspath(path)] = None
+
+    def unignore(self, paths: List[str]):
+        """Report ``paths`` again once events of the edits made while ignored have been read"""
+        expires = time.time() + IGNORE_GRACE_PERIOD
+        with self._ignored_lock:
+            for path in paths:
+                self._ignored[os.path.abspath(path)] = expires
+
+    def _is_ignored(self, path: str) -> bool:
+        with self._ignored_lock:
+            if path not in self._ignored:
+                return False
+            expires = self._ignored[path]
+            if expires is None or time.time() < expires:
+                return True
+            del self._ignored[path]
+            return False
+
+    def _add_watch(self, path: str) -> bool:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                self.logger.warning(
+                    "inotify watch limit reached, raise fs.inotify.max_user_watches "
+                    f"to watch {path}"
+                )
+            elif err not in (errno.ENOENT, errno.ENOTDIR):
+                self.logger.warning(f"Failed to watch {path}: {os.strerror(err)}")
+            return False
+        self._wd_paths[wd] = path
+        return True
+
+    def add_tree(self, root: str) -> int:
+        """Watch ``root`` and all non-excluded subdirectories; returns the number of watches added"""
+        root = os.path.abspath(root)
+        if root not in self._roots:
+            self._roots.append(root)
+        return self._watch_tree(root)
+
+    def _watch_tree(self, root: str) -> int:
+        count = 0
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not self._is_excluded(d)]
+            if self._add_watch(dirpath):
+                count += 1
+        return count
+
+    def read_changes(self, timeout: Optional[float]) -> Set[str]:
+        """
+        Wait up to ``timeout`` seconds (forever if None) for events.
+
+        Returns:
+            Set[str]: Changed paths; on queue overflow every watched root is reported
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    self.logger.warning("inotify event queue overflowed, treating all paths as changed")
+                    changed.update(self._roots)
+                    continue
+
+                directory = self._wd_paths.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    del self._wd_paths[wd]
+                    continue
+
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                if name and self._is_excluded(os.fsdecode(name)):
+                    continue
+                if self._is_ignored(path):
+                    continue
+                changed.add(path)
+
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(path)
+        return changed
+
+    def wait_for_changes(self, timeout: Optional[float], debounce: float) -> Set[str]:
+        """
+        Wait for a burst of changes and return once no new event arrived for ``debounce`` seconds.
+        """
+        changed = self.read_changes(timeout)
+        if not changed:
+            return changed
+
+        quiet_until = time.time() + debounce
+        while True:
+            remaining = quiet_until - time.time()
+            if remaining <= 0:
+                return changed
+            more = self.read_changes(remaining)
+            if more:
+                changed |= more
+                quiet_until = time.time() + debounce
@@ -1,10 +1,27 @@
 """Test framework main entry point"""
 import argparse
+import json
+import os
+import socket
 import sys
 
-from config.loader import ConfigLoader
-from core.testcase import TestCase
-from core.framework import TestFramework
+
+def parse_shard(value: str):
+    """Parse "I/N" into (I, N) with 1 <= I <= N"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', expected I/N, e.g. 2/4")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', need 1 <= I <= N")
+    return index, count
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0: {value}")
+    return number
 
 
 def main():
@@ -26,7 +43,95 @@ def main():
     run_parser.add_argument(
         '--tags',
         default=None,
-        help='Filter test cases by tags (comma-separated, e.g., "smoke,basic")'
+        help='Filter test cases by a tag expression, e.g. "smoke,basic" or '
+             '"smoke and not slow or (sdk12 and interop)"'
+    )
+    run_parser.add_argument(
+        '--fail-fast',
+        action='store_true',
+        help='Stop the run after the first failed test case'
+    )
+    run_parser.add_argument(
+        '--max-failures',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Stop the run after N failed test cases (default: 0, never stop)'
+    )
+    run_parser.add_argument(
+        '--changed-since',
+        default=None,
+        metavar='REV',
+        help='Only run test cases affected by git changes since REV, plus dependencies and dependents'
+    )
+    run_parser.add_argument(
+        '--repo',
+        default='.',
+        help='Git repository used by --changed-since (default: current directory)'
+    )
+    run_parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running and rerun affected test cases when their files change (Linux only)'
+    )
+    run_parser.add_argument(
+        '--debounce',
+        type=float,
+        default=0.5,
+        help='Seconds without further changes before a watch rerun starts (default: 0.5)'
+    )
+    run_parser.add_argument(
+        '--trace',
+        action='store_true',
+        help='Write a Chrome Trace Event timeline (opens in Perfetto) to output_dir'
+    )
+    run_parser.add_argument(
+        '--trace-otlp',
+        action='store_true',
+        help='Write the run timeline as OpenTelemetry (OTLP/JSON) spans to output_dir'
+    )
+    run_parser.add_argument(
+        '--resume',
+        default=None,
+        metavar='JOURNAL',
+        help='Continue an interrupted run from its journal (output_dir/journal_*.jsonl), '
+             'skipping test cases that already finished'
+    )
+    run_parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        default=None,
+        metavar='I/N',
+        help='Only run shard I of N; test cases connected by dependencies stay in one shard'
+    )
+    run_parser.add_argument(
+        '--jobs',
+        type=positive_int,
+        default=None,
+        metavar='N',
+        help='Worker threads for dependency prefetch and artifact actions '
+             '(overrides prefetch_workers and artifact_workers)'
+    )
+    run_parser.add_argument(
+        '--server',
+        default=None,
+        metavar='SOCKET',
+        help='Send the run to a framework server (see the server command) and stream its output'
+    )
+    
+    # server command
+    server_parser = subparsers.add_parser(
+        'server', help='Serve run requests on a Unix domain socket with the configuration kept loaded'
+    )
+    server_parser.add_argument(
+        '--config-dir',
+        default='.',
+        help='Configuration file directory (default: current directory)'
+    )
+    server_parser.add_argument(
+        '--socket',
+        default=None,
+        help='Socket path (default: CONFIG_DIR/.test_framework.sock)'
     )
     
     # validate command
@@ -36,6 +141,72 @@ def main():
         default='.',
         help='Configuration file directory (default: current directory)'
     )
+    validate_parser.add_argument(
+        '--tags',
+        default=None,
+        help='Show how many test cases match a tag expression'
+    )
+    
+    # compare command
+    compare_parser = subparsers.add_parser(
+        'compare', help='Compare test cases across the configured toolchains'
+    )
+    compare_parser.add_argument(
+        '--config-dir',
+        default='.',
+        help='Configuration file directory (default: current directory)'
+    )
+    compare_parser.add_argument(
+        '--tags',
+        default=None,
+        help='Filter test cases by a tag expression (dependencies are not executed)'
+    )
+    compare_parser.add_argument(
+        '--toolchains',
+        default=None,
+        metavar='A,B',
+        help='Comma-separated toolchain names, the first is the baseline (default: all configured)'
+    )
+    compare_parser.add_argument(
+        '--iterations',
+        type=int,
+        default=3,
+        metavar='N',
+        help='Runs per test case and toolchain (default: 3)'
+    )
+    compare_parser.add_argument(
+        '--workspace',
+        default=None,
+        help='Directory for the per-run copies of test case directories '
+             '(default: output_dir/compare_workspace)'
+    )
+    
+    # show command
+    show_parser = subparsers.add_parser('show', help='Show stored command output of a test case')
+    show_parser.add_argument('testcase', help='Test case name')
+    show_parser.add_argument(
+        '--command',
+        dest='command_index',
+        type=int,
+        default=None,
+        metavar='N',
+        help='Only show the output of the N-th command (1-based)'
+    )
+    show_parser.add_argument(
+        '--artifacts',
+        action='store_true',
+        help='Show artifact action outputs instead of command outputs'
+    )
+    show_parser.add_argument(
+        '--run',
+        default=None,
+        help='Run id (directory name under output_dir/outputs, default: latest run of the test case)'
+    )
+    show_parser.add_argument(
+        '--config-dir',
+        default='.',
+        help='Configuration file directory (default: current directory)'
+    )
     
     args = parser.parse_args()
     
@@ -44,25 +215,71 @@ def main():
         parser.print_help()
         return 0
     
+    # The server client needs none of the framework modules, keeping it fast to start
+    if args.command == 'run' and args.server:
+        return run_on_server(args)
+    
+    from config.loader import ConfigLoader
+    from config.tag_query import TagQuery
+    from core.graph import DependencyGraph
+    from core.testcase import TestCase
+    from core.framework import TestFramework
+    
     # Handle run command
     if args.command == 'run':
-        # Parse tags
-        tags = []
-        if args.tags:
-            tags = [tag.strip() for tag in args.tags.split(',')]
+        max_failures = 1 if args.fail_fast else args.max_failures
+        if max_failures < 0:
+            print("--max-failures cannot be negative")
+            return 1
         
-        framework = TestFramework(args.config_dir, tags=tags)
+        framework = TestFramework(
+            args.config_dir, tags=args.tags, max_failures=max_failures,
+            changed_since=args.changed_since, repo_dir=args.repo,
+            trace=args.trace, trace_otlp=args.trace_otlp, resume=args.resume,
+            shard=args.shard, jobs=args.jobs
+        )
         
         if not framework.initialize():
             print("Framework initialization failed")
             return 1
         
+        if args.watch:
+            try:
+                framework.watch(args.debounce)
+            except OSError as e:
+                print(f"[\u00d7] Watch mode unavailable: {e}")
+                return 1
+            return 0
+        
         framework.run()
         
         # Return exit code based on test results
         failed = sum(1 for tc in framework.testcases 
                     if tc.status == TestCase.STATUS_FAILED)
-        return 1 if failed > 0 else 0
+        return 1 if failed > 0 or framework.cancelled else 0
+    
+    elif args.command == 'compare':
+        toolchains = [t.strip() for t in args.toolchains.split(',') if t.strip()] \
+            if args.toolchains else None
+        framework = TestFramework(args.config_dir, tags=args.tags)
+        report = framework.compare(toolchains, args.iterations, args.workspace)
+        if report is None:
+            return 1
+        failed = any(not run['success'] for run in report['runs'])
+        return 1 if failed or report['cancelled'] else 0
+    
+    elif args.command == 'show':
+        return show_output(args)
+    
+    elif args.command == 'server':
+        from core.server import FrameworkServer
+        socket_path = args.socket or os.path.join(args.config_dir, '.test_framework.sock')
+        try:
+            FrameworkServer(args.config_dir, socket_path).serve()
+        except OSError as e:
+            print(f"[\u00d7] Server failed: {e}")
+            return 1
+        return 0
     
     # Handle validate command
     elif args.command == 'validate':
@@ -93,6 +310,18 @@ def main():
                 print(f"    - Dependencies: \u00d7 ({e})")
                 return 1
             
+            if args.tags:
+                try:
+                    query = TagQuery(args.tags)
+                except ValueError as e:
+                    print(f"    - Tags: \u00d7 ({e})")
+                    return 1
+                matched = config.tag_index.select(query)
+                with_deps = DependencyGraph(testcases).with_dependencies(matched)
+                print(f"\n    Tag expression: {args.tags}")
+                print(f"      Matched: {len(matched)} cases")
+                print(f"      With dependencies: {len(with_deps)} cases")
+            
         except Exception as e:
             print(f"[\u00d7] Configuration validation failed: {e}")
             return 1
@@ -103,5 +332,89 @@ def main():
     return 0
 
 
+def run_on_server(args) -> int:
+    """Send a run request to a framework server and print the streamed output"""
+    unsupported = [
+        flag for flag, value in (
+            ('--watch', args.watch), ('--resume', args.resume),
+            ('--trace', args.trace), ('--trace-otlp', args.trace_otlp),
+        ) if value
+    ]
+    if unsupported:
+        print(f"[\u00d7] Not supported with --server: {', '.join(unsupported)}")
+        return 1
+    
+    max_failures = 1 if args.fail_fast else args.max_failures
+    request = {
+        'action': 'run',
+        'tags': args.tags,
+        'max_failures': max_failures,
+        'changed_since': args.changed_since,
+        'repo': os.path.abspath(args.repo),
+        'shard': list(args.shard) if args.shard else None,
+        'jobs': args.jobs,
+    }
+    
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(args.server)
+            conn.sendall((json.dumps(request) + "\n").encode('utf-8'))
+            for line in conn.makefile('r', encoding='utf-8'):
+                message = json.loads(line)
+                if message['type'] == 'log':
+                    print(message['line'], flush=True)
+                elif message['type'] == 'result':
+                    return message['exit_code']
+                elif message['type'] == 'error':
+                    print(f"[\u00d7] {message['message']}")
+                    return 1
+    except (OSError, AttributeError) as e:
+        print(f"[\u00d7] Cannot reach server at {args.server}: {e}")
+        return 1
+    except KeyboardInterrupt:
+        # Closing the connection cancels the run on the server
+        print("Interrupted, run cancelled")
+        return 1
+    
+    print("[\u00d7] Server closed the connection before the run finished")
+    return 1
+
+
+def show_output(args) -> int:
+    """Print stored outputs of a test case from the output store"""
+    from config.loader import ConfigLoader
+    from core.output_store import OutputStore
+    
+    try:
+        framework_config = ConfigLoader(args.config_dir).load_global_config()
+    except Exception as e:
+        print(f"[\u00d7] Failed to load configuration: {e}")
+        return 1
+    
+    root = os.path.join(framework_config.output_dir, "outputs")
+    try:
+        run_id, entries = OutputStore.find(root, args.testcase, args.run)
+    except OSError as e:
+        print(f"[\u00d7] Failed to read output store: {e}")
+        return 1
+    
+    kind = "artifact" if args.artifacts else "command"
+    entries = [e for e in entries if e["kind"] == kind]
+    if args.command_index is not None:
+        entries = [e for e in entries if e["index"] == args.command_index]
+    if not entries:
+        print(f"No stored {kind} output for test case '{args.testcase}' in {root}")
+        return 1
+    
+    for entry in entries:
+        print("=" * 60)
+        print(f"Run: {run_id}  {kind.capitalize()} [{entry['index']}]: {entry['command']} "
+              f"(exit code: {entry['exit_code']})")
+        print("=" * 60)
+        sys.stdout.write(OutputStore.read(root, run_id, entry))
+        sys.stdout.flush()
+    return 0
+
+
 if __name__ == '__main__':
     sys.exit(main())
@@ -0,0 +1,66 @@
+"""Dependents of a test case must wait for its artifact actions"""
+
+import shutil
+import tempfile
+import unittest
+
+from config import models
+from core.framework import TestFramework as Framework
+from core.testcase import TestCase as FrameworkTestCase
+
+
+class ArtifactDependencyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def run_framework(self, action):
+        framework = models.FrameworkConfig.from_dict({
+            "build_tools": {
+                "ohpm_home": self.workdir,
+                "hvigor_home": self.workdir,
+                "deveco_sdk_home": self.workdir,
+                "ohos_base_sdk_home": self.workdir,
+            },
+            "output_dir": self.workdir,
+            "log_level": "WARNING",
+        })
+        testcases = [
+            models.TestCaseConfig.from_dict({
+                "name": "owner",
+                "path": self.workdir,
+                "commands": [["sh", "-c", "true"]],
+                "artifacts": {"action": [action]},
+            }),
+            models.TestCaseConfig.from_dict({
+                "name": "dependent",
+                "path": self.workdir,
+                "commands": [["sh", "-c", "true"]],
+                "dependencies": ["owner"],
+            }),
+        ]
+        test_framework = Framework(
+            self.workdir, config=models.Config(framework=framework, testcases=testcases)
+        )
+        self.assertTrue(test_framework.initialize())
+        test_framework.run()
+        return {tc.name: tc for tc in test_framework.testcases}
+
+    def test_failed_action_fails_dependent(self):
+        testcases = self.run_framework(["sh", "-c", "sleep 0.5; exit 1"])
+        self.assertEqual(testcases["owner"].status, FrameworkTestCase.STATUS_FAILED)
+        self.assertEqual(testcases["dependent"].status, FrameworkTestCase.STATUS_FAILED)
+        self.assertIn("dependency 'owner' failed", testcases["dependent"].error_message)
+        self.assertEqual(testcases["dependent"].executed_commands, [])
+
+    def test_successful_action_runs_dependent(self):
+        testcases = self.run_framework(["sh", "-c", "sleep 0.5"])
+        self.assertEqual(testcases["owner"].status, FrameworkTestCase.STATUS_PASSED)
+        self.assertEqual(testcases["dependent"].status, FrameworkTestCase.STATUS_PASSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
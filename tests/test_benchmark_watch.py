@@ -0,0 +1,67 @@
+"""Watch mode must not react to the edits of an incremental benchmark"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from config import models
+from core.executor import Executor
+from core.testcase import TestCase as FrameworkTestCase
+from core.watcher import InotifyWatcher
+
+
+def make_watcher():
+    try:
+        return InotifyWatcher()
+    except OSError as e:
+        raise unittest.SkipTest(str(e))
+
+
+class BenchmarkWatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.project = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.project, "src"))
+        for name in ("a.ets", "b.ets"):
+            with open(os.path.join(self.project, "src", name), "w", encoding="utf-8") as f:
+                f.write("let value = 1\n")
+
+        self.watcher = make_watcher()
+        self.watcher.add_tree(self.project)
+        self.executor = Executor(default_timeout=30)
+        self.executor.watcher = self.watcher
+        self.testcase = FrameworkTestCase(models.TestCaseConfig.from_dict({
+            "name": "bench",
+            "path": self.project,
+            "commands": [["sh", "-c", "true"]],
+            "type": "incremental_benchmark",
+            "benchmark": {
+                "iterations": 2,
+                "edits": [
+                    {"action": "touch", "file": "src/a.ets"},
+                    {"action": "append", "file": "src/a.ets"},
+                    {"action": "replace", "file": "src/a.ets", "pattern": "1", "replacement": "2"},
+                ],
+            },
+        }))
+
+    def tearDown(self):
+        self.watcher.close()
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def test_benchmark_edits_are_not_reported(self):
+        self.assertTrue(self.executor.execute_testcase(self.testcase), self.testcase.error_message)
+        self.assertIsNotNone(self.testcase.benchmark_results)
+        self.assertEqual(self.watcher.wait_for_changes(0.2, 0.1), set())
+
+    def test_other_files_are_still_reported(self):
+        self.assertTrue(self.executor.execute_testcase(self.testcase), self.testcase.error_message)
+        other = os.path.join(self.project, "src", "b.ets")
+        with open(other, "a", encoding="utf-8") as f:
+            f.write("// user edit\n")
+        self.assertEqual(self.watcher.wait_for_changes(1.0, 0.1), {other})
+
+
+if __name__ == "__main__":
+    unittest.main()
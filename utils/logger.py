@@ -2,9 +2,10 @@
 import logging
 import os
 import sys
-from datetime import datetime
 from typing import Optional
 
+from utils.run_id import new_run_id
+
 
 class ColoredFormatter(logging.Formatter):
     
@@ -46,6 +47,9 @@ def setup_logger(
 
     logger = logging.getLogger(name)
     
+    # Close the previous log file when set up again (server mode runs)
+    for handler in logger.handlers:
+        handler.close()
     logger.handlers.clear()
     
     level_map = {
@@ -67,8 +71,7 @@ def setup_logger(
     
     if log_dir:
         os.makedirs(log_dir, exist_ok=True)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        log_file = os.path.join(log_dir, f'test_framework_{timestamp}.log')
+        log_file = os.path.join(log_dir, f'test_framework_{new_run_id()}.log')
         
         file_handler = logging.FileHandler(log_file, encoding='utf-8')
         file_formatter = logging.Formatter(log_format, datefmt=date_format)
@@ -0,0 +1,16 @@
+"""Unique names for the files and directories written per run"""
+import itertools
+import os
+from datetime import datetime
+
+_sequence = itertools.count(1)
+
+
+def new_run_id() -> str:
+    """
+    Start time plus pid and a per-process sequence number.
+
+    The time alone is not unique: a server starts runs back to back, and
+    several framework processes may share an output_dir.
+    """
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{next(_sequence):03d}"
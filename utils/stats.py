@@ -0,0 +1,115 @@
+"""Statistics helpers for performance measurements"""
+import math
+import statistics
+from typing import Optional, Sequence
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile (``pct`` in 0-100) of a non-empty sequence"""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = math.floor(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: Sequence[float]) -> dict:
+    """Count, mean, standard deviation, min, median, p90 and max"""
+    values = list(values)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean': statistics.mean(values),
+        'stdev': statistics.stdev(values) if len(values) > 1 else 0.0,
+        'min': min(values),
+        'median': statistics.median(values),
+        'p90': percentile(values, 90),
+        'max': max(values),
+    }
+
+
+def _betacf(a: float, b: float, x: float) -> float:
+    # Continued fraction of the incomplete beta function (modified Lentz)
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 201):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 3e-12:
+            break
+    return h
+
+
+def _betainc(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta function I_x(a, b)"""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(
+        math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+        + a * math.log(x) + b * math.log(1.0 - x)
+    )
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def welch_t_test(a: Sequence[float], b: Sequence[float]) -> Optional[float]:
+    """
+    Two-sided p-value of Welch's t-test for a difference in means.
+
+    Returns:
+        Optional[float]: None if either sample has fewer than two values
+    """
+    if len(a) < 2 or len(b) < 2:
+        return None
+    mean_a, mean_b = statistics.mean(a), statistics.mean(b)
+    se_a = statistics.variance(a) / len(a)
+    se_b = statistics.variance(b) / len(b)
+    if se_a + se_b == 0:
+        return 1.0 if mean_a == mean_b else 0.0
+
+    t = (mean_a - mean_b) / math.sqrt(se_a + se_b)
+    df = (se_a + se_b) ** 2 / (
+        (se_a ** 2 / (len(a) - 1) if se_a else 0.0) + (se_b ** 2 / (len(b) - 1) if se_b else 0.0)
+    )
+    return _betainc(df / 2.0, 0.5, df / (df + t * t))
+
+
+def significance_marker(p_value: Optional[float]) -> str:
+    if p_value is None:
+        return ""
+    if p_value < 0.001:
+        return "***"
+    if p_value < 0.01:
+        return "**"
+    if p_value < 0.05:
+        return "*"
+    return ""
+
+
+def relative_delta(baseline: float, value: float) -> Optional[float]:
+    """Percentage change from baseline, None if the baseline is zero"""
+    if not baseline:
+        return None
+    return (value - baseline) / baseline * 100.0
@@ -0,0 +1,274 @@
+"""Run timeline tracing utilities"""
+import json
+import os
+import secrets
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class _NullSpan:
+
+    span_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_args(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullTracer:
+    """Tracer used when tracing is disabled; every call is a no-op"""
+
+    enabled = False
+
+    def span(self, name: str, category: str, parent: Optional[str] = None, **args):
+        return _NULL_SPAN
+
+    def record_span(self, name: str, category: str, start_ns: int, end_ns: int,
+                    parent: Optional[str] = None, **args):
+        pass
+
+    def counter(self, name: str, values: Dict[str, float]):
+        pass
+
+    def current_span_id(self) -> Optional[str]:
+        return None
+
+    def now_ns(self) -> int:
+        return 0
+
+
+class _Span:
+
+    def __init__(self, tracer: "Tracer", name: str, category: str,
+                 parent: Optional[str], args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.parent = parent
+        self.args = args
+        self.span_id = secrets.token_hex(8)
+        self.start_ns = 0
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        if self.parent is None and stack:
+            self.parent = stack[-1]
+        stack.append(self.span_id)
+        self.start_ns = self.tracer.now_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = self.tracer.now_ns()
+        self.tracer._stack().pop()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer._add_span(
+            self.name, self.category, self.start_ns, end_ns,
+            self.span_id, self.parent, self.args
+        )
+        return False
+
+    def set_args(self, **args):
+        self.args.update(args)
+
+
+class Tracer:
+    """
+    Collects spans and counter samples of a run in memory.
+
+    Spans carry the worker (thread) that executed them and nest per thread;
+    the result can be exported as Chrome Trace Event JSON (loadable in
+    Perfetto or chrome://tracing) or as OTLP/JSON shaped span data.
+    """
+
+    enabled = True
+
+    def __init__(self, service_name: str = "arkts_test_framework"):
+        self.service_name = service_name
+        self.trace_id = secrets.token_hex(16)
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._spans: List[Dict[str, Any]] = []
+        self._counters: List[Dict[str, Any]] = []
+        self._workers: List[tuple] = []
+        self._epoch_ns = time.time_ns()
+        self._perf_ns = time.perf_counter_ns()
+
+    def now_ns(self) -> int:
+        """Wall clock time in nanoseconds with perf_counter resolution"""
+        return self._epoch_ns + (time.perf_counter_ns() - self._perf_ns)
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _worker(self) -> int:
+        # Thread idents are reused once a thread exits, so the id lives on the thread itself
+        worker = getattr(self._local, 'worker', None)
+        if worker is None:
+            with self._lock:
+                worker = len(self._workers) + 1
+                self._workers.append((worker, threading.current_thread().name))
+            self._local.worker = worker
+        return worker
+
+    def span(self, name: str, category: str, parent: Optional[str] = None, **args) -> _Span:
+        """Context manager timing a block; nested spans on the same thread become children"""
+        return _Span(self, name, category, parent, args)
+
+    def current_span_id(self) -> Optional[str]:
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def record_span(self, name: str, category: str, start_ns: int, end_ns: int,
+                    parent: Optional[str] = None, **args):
+        """Record a span measured elsewhere, e.g. time spent waiting in a queue"""
+        self._add_span(name, category, start_ns, end_ns, secrets.token_hex(8),
+                       parent or self.current_span_id(), args)
+
+    def _add_span(self, name, category, start_ns, end_ns, span_id, parent, args):
+        worker = self._worker()
+        with self._lock:
+            self._spans.append({
+                'name': name,
+                'category': category,
+                'start_ns': start_ns,
+                'end_ns': end_ns,
+                'worker': worker,
+                'span_id': span_id,
+                'parent': parent,
+                'args': args,
+            })
+
+    def counter(self, name: str, values: Dict[str, float]):
+        """Record a sample of one or more counters (e.g. memory of a command)"""
+        ts = self.now_ns()
+        with self._lock:
+            self._counters.append({'name': name, 'ts_ns': ts, 'values': values})
+
+    def _ts_us(self, ns: int) -> float:
+        return (ns - self._epoch_ns) / 1000.0
+
+    def export_chrome(self, path: str):
+        events = [{
+            'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': 0,
+            'args': {'name': self.service_name},
+        }]
+        with self._lock:
+            workers = list(self._workers)
+            spans = list(self._spans)
+            counters = list(self._counters)
+
+        for worker_id, thread_name in workers:
+            events.append({
+                'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': worker_id,
+                'args': {'name': f"worker {worker_id} ({thread_name})"},
+            })
+        for span in spans:
+            events.append({
+                'name': span['name'],
+                'cat': span['category'],
+                'ph': 'X',
+                'pid': self.pid,
+                'tid': span['worker'],
+                'ts': self._ts_us(span['start_ns']),
+                'dur': (span['end_ns'] - span['start_ns']) / 1000.0,
+                'args': span['args'],
+            })
+        for sample in counters:
+            events.append({
+                'name': sample['name'],
+                'ph': 'C',
+                'pid': self.pid,
+                'ts': self._ts_us(sample['ts_ns']),
+                'args': sample['values'],
+            })
+
+        self._write_json(path, {'traceEvents': events, 'displayTimeUnit': 'ms'})
+
+    @staticmethod
+    def _otlp_value(value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {'boolValue': value}
+        if isinstance(value, int):
+            return {'intValue': str(value)}
+        if isinstance(value, float):
+            return {'doubleValue': value}
+        if isinstance(value, (list, tuple)):
+            return {'stringValue': " ".join(str(v) for v in value)}
+        return {'stringValue': str(value)}
+
+    def export_otlp(self, path: str):
+        with self._lock:
+            workers = dict(self._workers)
+            spans = list(self._spans)
+
+        otlp_spans = []
+        for span in spans:
+            attributes = dict(span['args'])
+            attributes['category'] = span['category']
+            attributes['worker.id'] = span['worker']
+            attributes['thread.name'] = workers.get(span['worker'], "")
+            otlp_span = {
+                'traceId': self.trace_id,
+                'spanId': span['span_id'],
+                'name': span['name'],
+                'kind': 1,
+                'startTimeUnixNano': str(span['start_ns']),
+                'endTimeUnixNano': str(span['end_ns']),
+                'attributes': [
+                    {'key': key, 'value': self._otlp_value(value)}
+                    for key, value in attributes.items()
+                ],
+            }
+            if span['parent']:
+                otlp_span['parentSpanId'] = span['parent']
+            otlp_spans.append(otlp_span)
+
+        self._write_json(path, {
+            'resourceSpans': [{
+                'resource': {'attributes': [
+                    {'key': 'service.name', 'value': {'stringValue': self.service_name}},
+                    {'key': 'process.pid', 'value': {'intValue': str(self.pid)}},
+                ]},
+                'scopeSpans': [{
+                    'scope': {'name': self.service_name},
+                    'spans': otlp_spans,
+                }],
+            }]
+        })
+
+    @staticmethod
+    def _write_json(path: str, data: Dict[str, Any]):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, default=str)
+
+
+_tracer = NullTracer()
+
+
+def setup_tracer(enabled: bool) -> "Tracer":
+    """Install the process-wide tracer; a disabled tracer costs one attribute check per span"""
+    global _tracer
+    _tracer = Tracer() if enabled else NullTracer()
+    return _tracer
+
+
+def get_tracer():
+
+    return _tracer